@@ -0,0 +1,642 @@
+"""
+Benchmarks of dataclass-jsonable.
+
+Usage:
+
+    python benchmark.py             # Runs all benchmarks.
+    python benchmark.py iterative   # Runs benchmarks whose names contain "iterative".
+"""
+
+import gc
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import timeit
+from dataclasses import asdict, dataclass, field, make_dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generic,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+
+from dataclass_jsonable import (
+    J,
+    JSONAbleFile,
+    dump_schema_cache,
+    json_options,
+    load_schema_cache,
+)
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+
+def benchmark(f: Callable[[], None]) -> Callable[[], None]:
+    BENCHMARKS[f.__name__] = f
+    return f
+
+
+def run(name: str, stmt: Callable[[], object], number: int) -> None:
+    """Prints the best time of a single call of `stmt`."""
+    t = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    print(f"{name:<50} {t * 1e6:12.2f} us")
+
+
+@dataclass
+class RecursiveNode(J):
+    __default_json_options__ = json_options(omitempty=True)
+
+    data: int
+    children: List["RecursiveNode"] = field(default_factory=list)
+    next: Optional["RecursiveNode"] = None
+
+
+@dataclass
+class IterativeNode(J):
+    __json_iterative__ = True
+    __default_json_options__ = json_options(omitempty=True)
+
+    data: int
+    children: List["IterativeNode"] = field(default_factory=list)
+    next: Optional["IterativeNode"] = None
+
+
+def make_tree(cls, depth: int, width: int):
+    if depth == 0:
+        return cls(data=1)
+    return cls(data=depth + 1, children=[make_tree(cls, depth - 1, width)] * width)
+
+
+def make_chain(cls, length: int):
+    node = cls(data=1)
+    for i in range(1, length):
+        node = cls(data=i + 1, next=node)
+    return node
+
+
+@benchmark
+def bench_iterative() -> None:
+    for cls in (RecursiveNode, IterativeNode):
+        tree = make_tree(cls, 6, 4)
+        d = tree.json()
+        run(f"{cls.__name__}: encode tree (5461 nodes)", tree.json, 20)
+        run(f"{cls.__name__}: decode tree (5461 nodes)", lambda: cls.from_json(d), 20)
+
+    for cls in (RecursiveNode, IterativeNode):
+        chain = make_chain(cls, 200)
+        d = chain.json()
+        run(f"{cls.__name__}: encode chain (depth 200)", chain.json, 200)
+        run(f"{cls.__name__}: decode chain (depth 200)", lambda: cls.from_json(d), 200)
+
+    chain = make_chain(IterativeNode, 100000)
+    d = chain.json()
+    run("IterativeNode: encode chain (depth 100000)", chain.json, 1)
+    run(
+        "IterativeNode: decode chain (depth 100000)",
+        lambda: IterativeNode.from_json(d),
+        1,
+    )
+
+
+@dataclass
+class Brand(J):
+    name: str
+    description: str
+    tags: List[str]
+
+
+@dataclass
+class Product(J):
+    sku: str
+    brand: Brand
+
+
+@dataclass
+class Catalog(J):
+    products: List[Product]
+
+
+@benchmark
+def bench_memo() -> None:
+    brands = [
+        Brand(f"b{i}", "x" * 100, [f"t{j}" for j in range(20)]) for i in range(10)
+    ]
+    catalog = Catalog([Product(f"p{i}", brands[i % 10]) for i in range(1000)])
+    run("Catalog: encode (1000 products, 10 brands)", catalog.json, 20)
+    run("Catalog: encode memo=True", lambda: catalog.json(memo=True), 20)
+    run("Catalog: encode refs=True", lambda: catalog.json(refs=True), 20)
+
+
+@dataclass
+class Sparse(J):
+    __default_json_options__ = json_options(omitempty=True)
+
+    a: Optional[int] = None
+    b: Optional[str] = None
+    c: Optional[float] = None
+    d: Optional[datetime] = None
+    e: List[int] = field(default_factory=list)
+    f: Optional["Sparse"] = None
+    g: str = ""
+    h: int = 1
+
+
+@benchmark
+def bench_omitempty() -> None:
+    o = Sparse()
+    d = o.json()
+    run("Sparse: encode (omitempty, mostly empty)", o.json, 100000)
+    run("Sparse: decode (omitempty, mostly empty)", lambda: Sparse.from_json(d), 100000)
+
+
+@benchmark
+def bench_threads() -> None:
+    def decode_in_threads(n_threads: int) -> None:
+        # A fresh class per run, so the threads race on its first use.
+        Order = make_dataclass(
+            "Order",
+            [("id", int), ("products", List[Product], field(default_factory=list))],
+            bases=(J,),
+        )
+        brand = {"name": "b", "description": "x", "tags": []}
+        ds = [
+            {"id": i, "products": [{"sku": "p", "brand": brand}]} for i in range(1000)
+        ]
+        barrier = threading.Barrier(n_threads)
+
+        def work() -> None:
+            barrier.wait()
+            Order.from_json_many(ds)
+
+        threads = [threading.Thread(target=work) for _ in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    for n in (1, 8):
+        run(
+            f"Order: decode 1000 records x {n} threads", lambda: decode_in_threads(n), 5
+        )
+
+
+@dataclass
+class Model(J):
+    id: int = 0
+    uid: str = ""
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    created_by: str = ""
+    updated_by: str = ""
+    version: int = 0
+    tags: List[str] = field(default_factory=list)
+    labels: Dict[str, str] = field(default_factory=dict)
+    note: Optional[str] = None
+    owner: Optional[Brand] = None
+    deleted: bool = False
+
+
+def make_models(n: int, overridden: bool) -> list:
+    """Makes `n` subclasses of Model, each declares one more field. With
+    `overridden`, they override the class-level options, so that plans of the
+    inherited fields can't be reused.
+    """
+    ns = (
+        {"__default_json_options__": json_options(omitempty=True)} if overridden else {}
+    )
+    return [
+        dataclass(
+            type(f"Model{i}", (Model,), {"__annotations__": {"x": int}, "x": 0, **ns})
+        )
+        for i in range(n)
+    ]
+
+
+@benchmark
+def bench_inheritance() -> None:
+    Model._get_plan()
+    for overridden in (False, True):
+        models = make_models(2000, overridden)
+        t = timeit.default_timer()
+        for cls in models:
+            cls._get_plan()
+        t = timeit.default_timer() - t
+        name = "overridden options" if overridden else "inherited plans"
+        print(f"{'Plans of 2000 models (' + name + ')':<50} {t * 1e6:12.2f} us")
+
+
+def make_annotated_models(n: int) -> list:
+    """Makes `n` dataclasses with string annotations, registered as globals of this
+    module so that they can be exported to a schema cache file.
+    """
+    annotations = {
+        "id": "int",
+        "tags": "List[str]",
+        "labels": "Dict[str, List[int]]",
+        "owner": "Optional[Brand]",
+        "created_at": "Optional[datetime]",
+    }
+    models = []
+    for i in range(n):
+        name = f"AnnotatedModel{i}"
+        cls = dataclass(type(name, (J,), {"__annotations__": annotations}))
+        cls.__module__ = __name__
+        globals()[name] = cls
+        models.append(cls)
+    return models
+
+
+@benchmark
+def bench_schema_cache() -> None:
+    models = make_annotated_models(1000)
+    attrs = (
+        "__dataclass_jsonable_plan__",
+        "__dataclass_jsonable_options__",
+        "__dataclass_jsonable_hints__",
+    )
+
+    def reset() -> None:
+        for cls in models:
+            for attr in attrs:
+                if attr in cls.__dict__:
+                    delattr(cls, attr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "schema.cache")
+        dump_schema_cache(path, models)
+        for cached in (False, True):
+            reset()
+            t = timeit.default_timer()
+            if cached:
+                load_schema_cache(path)
+            for cls in models:
+                cls._get_plan()
+            t = timeit.default_timer() - t
+            name = "with schema cache" if cached else "cold"
+            print(f"{'Plans of 1000 models (' + name + ')':<50} {t * 1e6:12.2f} us")
+
+
+def make_event_stream(n_types: int, tagged: bool) -> type:
+    """Makes a dataclass holding a list of events of `n_types` types, each type
+    has its own field so that untagged events can be told apart.
+    """
+    events = []
+    for i in range(n_types):
+        ns = {"__json_tag__": f"event{i}"} if tagged else {}
+        fields = [("at", int), (f"data{i}", str)]
+        events.append(make_dataclass(f"Event{i}", fields, bases=(J,), namespace=ns))
+    return make_dataclass(
+        "Stream", [("events", List[Union[tuple(events)]])], bases=(J,)  # type: ignore
+    )
+
+
+@benchmark
+def bench_union() -> None:
+    n = 40
+    for tagged in (False, True):
+        stream = make_event_stream(n, tagged)
+        tags = [{"type": f"event{i}"} if tagged else {} for i in range(n)]
+        d = {
+            "events": [
+                {**tags[i % n], "at": i, f"data{i % n}": "x"} for i in range(1000)
+            ]
+        }
+        o = stream.from_json(d)
+        name = "tagged" if tagged else "untagged"
+        run(f"Stream of {n} event types: encode 1000 ({name})", o.json, 20)
+        run(
+            f"Stream of {n} event types: decode 1000 ({name})",
+            lambda: stream.from_json(d),
+            20,
+        )
+
+
+@dataclass
+class PriceTable(J):
+    prices: Dict[int, Brand] = field(default_factory=dict)
+
+
+@benchmark
+def bench_dict_keys() -> None:
+    o = PriceTable({i: Brand(str(i), "", []) for i in range(1000)})
+    d = o.json()
+    run("PriceTable: encode 1000 int keys", o.json, 100)
+    run("PriceTable: decode 1000 int keys", lambda: PriceTable.from_json(d), 100)
+
+
+Wide = make_dataclass(
+    "Wide",
+    [(f"f{i}", List[int], field(default_factory=list)) for i in range(80)],
+    bases=(J,),
+)
+
+
+@benchmark
+def bench_projection() -> None:
+    d = {f"f{i}": list(range(10)) for i in range(80)}
+    fields = [f"f{i}" for i in range(5)]
+    projection = Wide.projection(*fields)
+    run("Wide: decode 80 fields", lambda: Wide.from_json(d), 1000)
+    run("Wide: decode 5 fields", lambda: Wide.from_json(d, fields=fields), 1000)
+    run("Wide: decode 5 fields (projection)", lambda: projection.from_json(d), 1000)
+    o = Wide.from_json(d)
+    run("Wide: encode 80 fields", o.json, 1000)
+    run("Wide: encode 5 fields", lambda: o.json(fields=fields), 1000)
+
+
+@benchmark
+def bench_jsonable_file() -> None:
+    n = 100000
+    brand = Brand("acme", "", ["a", "b"])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "brands.jsonl")
+        with open(path, "w") as f:
+            for _ in range(n):
+                f.write(json.dumps(brand.json()) + "\n")
+
+        def open_file(index_path=None) -> None:
+            JSONAbleFile(Brand, path, index_path=index_path).close()
+
+        index_path = os.path.join(tmp, "brands.idx")
+        run(f"JSONAbleFile: open {n} lines", open_file, 5)
+        open_file(index_path)
+        run(f"JSONAbleFile: open {n} lines (index)", lambda: open_file(index_path), 5)
+
+        indices = [random.randrange(n) for _ in range(1000)]
+        with JSONAbleFile(Brand, path, cache_size=0) as brands:
+            run(
+                "JSONAbleFile: read 1000 random lines",
+                lambda: [brands[i] for i in indices],
+                5,
+            )
+
+
+@benchmark
+def bench_bytes() -> None:
+    brands = [Brand(f"b{i}", "x" * 10, [f"t{j}" for j in range(3)]) for i in range(10)]
+    catalog = Catalog([Product(f"p{i}", brands[i % 10]) for i in range(1000)])
+    s = json.dumps(catalog.json())
+    b = catalog.to_bytes()
+    print(f"{'Catalog: size of json / bytes':<50} {len(s):>8} / {len(b)}")
+    run("Catalog: json.dumps(json())", lambda: json.dumps(catalog.json()), 20)
+    run("Catalog: to_bytes()", catalog.to_bytes, 20)
+    run(
+        "Catalog: from_json(json.loads())", lambda: Catalog.from_json(json.loads(s)), 20
+    )
+    run("Catalog: from_bytes()", lambda: Catalog.from_bytes(b), 20)
+
+
+@benchmark
+def bench_json_into() -> None:
+    brands = [Brand(f"b{i}", "x" * 10, [f"t{j}" for j in range(3)]) for i in range(10)]
+    catalogs = [
+        Catalog([Product(f"p{i}", brands[(i + j) % 10]) for i in range(10)])
+        for j in range(1000)
+    ]
+
+    def dumps() -> None:
+        json.dumps([o.json() for o in catalogs])
+
+    def dumps_into() -> None:
+        "[" + ",".join(map(json.dumps, Catalog.iter_json(catalogs))) + "]"
+
+    for name, f in (("json()", dumps), ("iter_json()", dumps_into)):
+        run(f"Catalog: dumps 1000 via {name}", f, 10)
+        # timeit disables the garbage collector, counts the collections separately.
+        collections = gc.get_stats()[0]["collections"]
+        for _ in range(10):
+            f()
+        collections = gc.get_stats()[0]["collections"] - collections
+        print(f"{'  gen-0 collections per 10 calls':<50} {collections:>12}")
+
+
+@dataclass
+class Creator(J):
+    name: str
+    registered_at: datetime
+
+
+@dataclass
+class Owner(J):
+    name: str
+    creators: List[Creator]
+
+
+@dataclass
+class Repository(J):
+    owner: Owner
+
+
+@benchmark
+def bench_decode_errors() -> None:
+    creators = [{"name": f"c{i}", "registered_at": i} for i in range(10)]
+    ds = [{"owner": {"name": "o", "creators": creators}} for _ in range(100)]
+    bad = {"owner": {"name": "o", "creators": creators[:3] + [{"name": "x"}]}}
+    run("Repository: decode 100 records", lambda: Repository.from_json_many(ds), 50)
+
+    def decode_bad() -> None:
+        try:
+            Repository.from_json(bad)
+        except Exception as e:
+            str(e)
+
+    run("Repository: decode a bad record", decode_bad, 1000)
+
+    dirty = [bad if i % 10 == 0 else ds[0] for i in range(100)]
+    run(
+        "Repository: from_json_batch 100 records (10% bad)",
+        lambda: Repository.from_json_batch(dirty),
+        50,
+    )
+
+
+@benchmark
+def bench_iter_json_array() -> None:
+    brand = Brand("acme", "x" * 10, ["a", "b"])
+    s = json.dumps({"data": {"items": [brand.json()] * 10000}})
+
+    def load() -> None:
+        [Brand.from_json(d) for d in json.loads(s)["data"]["items"]]
+
+    def stream() -> None:
+        for _ in Brand.iter_json_array(io.StringIO(s), path="data.items"):
+            pass
+
+    run("Brand: json.loads 10000 array elements", load, 5)
+    run("Brand: iter_json_array 10000 array elements", stream, 5)
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(J, Generic[T]):
+    items: List[T]
+    total: int = 0
+
+
+@dataclass
+class AnyPage(J):
+    items: List[Any]
+    total: int = 0
+
+
+@benchmark
+def bench_generic() -> None:
+    brand = Brand("acme", "x" * 10, ["a", "b"])
+    page = Page([brand] * 100, 100)
+    d = Page[Brand](page.items, 100).json()
+    run("Page[Brand]: encode 100 items", Page[Brand](page.items, 100).json, 200)
+    run("Page[Brand]: decode 100 items", lambda: Page[Brand].from_json(d), 200)
+    any_page = AnyPage([brand] * 100, 100)
+    run("AnyPage: encode 100 items (Any)", any_page.json, 200)
+    run("AnyPage: decode 100 items (Any, to dicts)", lambda: AnyPage.from_json(d), 200)
+
+
+@dataclass
+class PlainBrand:
+    name: str
+    description: str
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PlainCatalog:
+    brands: List[PlainBrand]
+
+
+@dataclass
+class Store(J):
+    catalog: PlainCatalog
+
+
+@dataclass
+class AnyStore(J):
+    catalog: Any
+
+
+@benchmark
+def bench_plain_dataclass() -> None:
+    brands = [PlainBrand("acme", "x" * 10, ["a", "b"]) for _ in range(100)]
+    store = Store(PlainCatalog(brands))
+    d = store.json()
+    run("Store: encode 100 plain dataclasses", store.json, 200)
+    run(
+        "AnyStore: encode via dataclasses.asdict",
+        lambda: AnyStore(asdict(store.catalog)).json(),
+        200,
+    )
+    run("Store: decode 100 plain dataclasses", lambda: Store.from_json(d), 200)
+
+
+@dataclass
+class Tagged(J):
+    tags: Set[str]
+    ids: FrozenSet[int]
+
+
+@dataclass
+class SortedTagged(J):
+    __default_json_options__ = json_options(sort_set=True)
+
+    tags: Set[str]
+    ids: FrozenSet[int]
+
+
+@benchmark
+def bench_set() -> None:
+    tags, ids = {f"t{i}" for i in range(100)}, frozenset(range(100))
+    o = Tagged(tags, ids)
+    d = o.json()
+    run("Tagged: encode 2 sets of 100 scalars", o.json, 2000)
+    run("SortedTagged: encode 2 sorted sets", SortedTagged(tags, ids).json, 2000)
+    run("Tagged: decode 2 sets of 100 scalars", lambda: Tagged.from_json(d), 2000)
+
+
+@dataclass(frozen=True)
+class FrozenCatalog(J):
+    __json_hash_cache__ = True
+
+    products: List[Product]
+
+
+@benchmark
+def bench_content_hash() -> None:
+    brand = Brand("acme", "x" * 10, ["a", "b"])
+    catalog = Catalog([Product(f"p{i}", brand) for i in range(100)])
+
+    def dumps_hash() -> str:
+        s = json.dumps(catalog.json(), sort_keys=True)
+        return hashlib.sha256(s.encode()).hexdigest()
+
+    run("Catalog: sha256 of json.dumps(sort_keys=True)", dumps_hash, 200)
+    run("Catalog: content_hash()", catalog.content_hash, 200)
+    frozen = FrozenCatalog(catalog.products)
+    run("FrozenCatalog: content_hash() (cached)", frozen.content_hash, 200)
+
+
+def make_ledger(**options: Any) -> type:
+    fields = [
+        (f"amount{i}", Decimal, field(metadata={"j": json_options(**options)}))
+        for i in range(100)
+    ]
+    return make_dataclass("Ledger", fields, bases=(J,))
+
+
+@benchmark
+def bench_decimal() -> None:
+    d = {f"amount{i}": f"{i}.25" for i in range(100)}
+    Ledger = make_ledger()
+    run("Ledger: decode 100 Decimals", lambda: Ledger.from_json(d), 2000)
+    d_int = {f"amount{i}": i * 100 for i in range(100)}
+    run("Ledger: decode 100 Decimals from ints", lambda: Ledger.from_json(d_int), 2000)
+    Cents = make_ledger(decimal_places=2)
+    run(
+        "Ledger: decode 100 Decimals, decimal_places=2",
+        lambda: Cents.from_json(d),
+        2000,
+    )
+
+
+@dataclass
+class Event(J):
+    payload: Any
+
+
+@benchmark
+def bench_any() -> None:
+    payload = {
+        "user": {"id": 1, "name": "u", "tags": ["a", "b", "c"], "vip": True},
+        "items": [
+            {"sku": f"p{i}", "qty": i, "price": 1.5, "note": None} for i in range(50)
+        ],
+    }
+    event = Event(payload)
+    d = event.json()
+    run("Event: encode Any payload of 50 items", event.json, 500)
+    run("Event: decode Any payload of 50 items", lambda: Event.from_json(d), 500)
+
+
+def main() -> None:
+    patterns = sys.argv[1:]
+    for name, f in BENCHMARKS.items():
+        if not patterns or any(p in name for p in patterns):
+            print(f"# {name}")
+            f()
+
+
+if __name__ == "__main__":
+    main()
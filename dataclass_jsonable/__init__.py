@@ -6,33 +6,69 @@ Requires: Python >= 3.7
 Supported type annotations:
 
     bool, int, float, str, Decimal, datetime, date, timedelta, Enum, IntEnum
-    Any, Optional[X]
-    List[X], Tuple[X, ...], Set[X], Dict[str, X],
-    JSONAble (nested)
+    Any, Optional[X], Union[X, Y, ...]
+    List[X], Tuple[X, ...], Tuple[X, Y, ...], Set[X], FrozenSet[X], Dict[K, X],
+    JSONAble (nested), generic JSONAble (parameterized like Page[X]),
+    plain dataclasses, NamedTuple, TypedDict (nested)
 """
 
+import codecs
+import dataclasses
+import decimal
 import enum
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import re
+import struct
 import sys
-from dataclasses import MISSING, dataclass, is_dataclass
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import MISSING, Field, dataclass, is_dataclass
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from enum import Enum
+from operator import attrgetter, itemgetter, not_
 from types import MappingProxyType
 from typing import (
+    IO,
     Any,
     Callable,
     ClassVar,
     Dict,
     ForwardRef,
+    FrozenSet,
+    Iterable,
+    Iterator,
     List,
+    Mapping,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
     get_type_hints,
 )
 
-__all__ = ("json_options", "JSONAble", "JSON", "J", "zero")
+__all__ = (
+    "json_options",
+    "JSONAble",
+    "JSON",
+    "J",
+    "zero",
+    "DecodeContext",
+    "DecodeError",
+    "DecodeTypeError",
+    "Projection",
+    "JSONAbleFile",
+    "dump_schema_cache",
+    "load_schema_cache",
+)
 
 # Any value, in short.
 V = Any
@@ -133,6 +169,32 @@ class json_options:
     # but it's more convenient to work with the builtin decoder functions.
     before_decoder: Optional[F] = None
 
+    # Decode a field typed `List[int]`, `List[float]`, `Tuple[int, ...]` or
+    # `Tuple[float, ...]` to a numeric array in a single call, rather than a per
+    # element conversion. Available values:
+    #   * "numpy": decode to a `numpy.ndarray` (int64 or float64). Falls back to
+    #     "array" if NumPy is not installed.
+    #   * "array": decode to a stdlib `array.array` (typecode "q" or "d").
+    # The arrays are encoded back to lists. Optional ones are supported as well, and
+    # fields of other types are not affected, so this can be set at class-level.
+    # Note that numpy arrays can't be compared by the `__eq__` generated by
+    # `@dataclass` (it raises ValueError), declare the dataclass with `eq=False`
+    # and compare the fields with `numpy.array_equal` if needed.
+    as_array: Optional[str] = None
+
+    # Encode a field typed `Set[E]` or `FrozenSet[E]` (or optional) to a sorted list,
+    # defaults to False. By default the list is in the set's iteration order, which
+    # may differ between runs, e.g. for strings. Sorting gives deterministic outputs,
+    # e.g. for caching or hashing. The elements should be comparable once encoded.
+    # Fields of other types are not affected, so this can be set at class-level.
+    sort_set: Optional[bool] = None
+
+    # Quantize the value of a field typed `Decimal` (or optional) to this number of
+    # decimal places, on both decoding and encoding, e.g. 2 for "1.50". Rounds half
+    # to even. Fields of other types are not affected, so this can be set at
+    # class-level, e.g. for a ledger whose amounts are all in cents.
+    decimal_places: Optional[int] = None
+
     def __post_init__(self):
         # Handle alias options
         if self.encoder is None:
@@ -153,8 +215,12 @@ _BASIC_TYPES = {  # Ensures callable
     set,
     tuple,
     Decimal,
+    frozenset,
 }
 
+# Types of JSON-native scalars, whose values are encoded as they are.
+_JSON_SCALAR_TYPES = {bool, int, float, str}
+
 
 def zero(t) -> V:
     """
@@ -181,25 +247,110 @@ def zero(t) -> V:
         args = _get_generics_args(t)
 
         if ot is Union:
-            # Not support Union[X, Y, Z, ...]
-            if len(args) != 2 or args[1] is not type(None):
-                raise NotImplementedError("only Optional[X] union type is supported")
-            # Optional[E]
-            return None
+            if type(None) in args:
+                # Optional[E], or a union including None.
+                return None
+            # Union[X, Y, Z, ...], the zero value of the first member.
+            return zero(args[0])
 
         return zero(ot)
     if isinstance(t, type) and issubclass(t, J):
         # J
         return t.from_json({})  # type: ignore
-    if is_dataclass(t):
-        # dataclasses
-        return t()  # type: ignore
+    if _is_plain_record(t):
+        # Plain dataclasses, NamedTuples and TypedDicts, required fields zeroed.
+        adapter = _get_record_adapter(t)
+        plan = adapter._get_plan()
+        kwds = {p.name: zero(p.t) for p in plan if p.required}
+        return adapter._construct({}, kwds, {})  # type: ignore
     raise NotImplementedError(f"not supported type {t}")
 
 
-@dataclass
+class DecodeError(ValueError):
+    """Raised by `from_json` if decoding fails. The original error is kept as
+    attribute `error` (also the `__cause__`). `NotImplementedError` raised for the
+    types not supported isn't wrapped, as it's an error of the schema, not the data.
+
+    :ivar doc: the dictionary being decoded when it fails, maybe a nested one.
+    :ivar key: the key of the failing field in `doc`, or None if the failure is not
+       of a single field, e.g. a required field is missing.
+    :ivar root: the dictionary passed to the outermost `from_json`.
+    :ivar index: the index of the record in the batch, set by `from_json_batch`.
+
+    The path of the failing field from the root, e.g. `owner.creators[3].name`, is
+    located lazily by searching `doc` in `root` only when it's accessed, so raising
+    this error is cheap.
+    """
+
+    def __init__(self, error: Exception, doc: V, key: Optional[str]) -> None:
+        super().__init__(error)
+        self.error = error
+        self.doc = doc
+        self.key = key
+        self.root = doc
+        self.index: Optional[int] = None
+        self._path: Optional[str] = None
+
+    def __reduce__(self):
+        return type(self), (self.error, self.doc, self.key), self.__dict__
+
+    @property
+    def path(self) -> str:
+        """Path of the failing field (or dictionary) from the root."""
+        if self._path is None:
+            segments = _find_json_path(self.root, self.doc)
+            if segments is None:
+                # Not reachable from the root, e.g. decoded by a custom decoder.
+                segments = ["?"]
+            if self.key is not None:
+                segments.append(self.key)
+            path = "".join(
+                f"[{s}]" if isinstance(s, int) else f".{s}" for s in segments
+            )
+            self._path = path.lstrip(".")
+        return self._path
+
+    def __str__(self) -> str:
+        path = self.path
+        if path:
+            return f"{path}: {self.error}"
+        return str(self.error)
+
+
+class DecodeTypeError(DecodeError, TypeError):
+    """`DecodeError` wrapping a `TypeError`, e.g. a required field is missing, which
+    is a `TypeError` as well, so that the code catching the original error still
+    works.
+    """
+
+
+# Errors of decoding invalid values, e.g. `int("x")`, a missing key or a wrong type.
+# `NotImplementedError` of the types not supported isn't one of them.
+_DECODE_VALUE_ERRORS = (
+    ValueError,
+    TypeError,
+    LookupError,
+    AttributeError,
+    ArithmeticError,
+)
+
+
+def _make_decode_error(error: Exception, doc: V, key: Optional[str]) -> DecodeError:
+    """Returns the `DecodeError` wrapping `error`, see `DecodeTypeError`."""
+    if isinstance(error, TypeError):
+        return DecodeTypeError(error, doc, key)
+    return DecodeError(error, doc, key)
+
+
 class JSONAble:
-    """Base of jsonable dataclass."""
+    """Base of jsonable dataclass.
+
+    This base class itself is not decorated by `@dataclass`, so that both frozen and
+    non-frozen dataclasses can extend it.
+    """
+
+    # Fields of the dataclass, set by the `@dataclass` decorator on subclasses.
+    __dataclass_fields__: ClassVar[Dict[str, Field]]
 
     # Default json_options for this dataclass.
     #
@@ -218,7 +369,8 @@ class JSONAble:
     # During a `from_json` calling, if a field's key is missing in the given dictionary,
     # and at the same time there's no default value or default_factory declared for this
     # field, and `default_before_decoding` option is neither used, then a
-    # "missing positional argument" TypeError will finally raise.
+    # `DecodeTypeError` wrapping the "missing positional argument" TypeError will
+    # finally raise.
     #
     # The standard dataclasses library provides field-level field keyword `default`
     # and `default_factory` to prevent this error. Here dataclasses-jsonable provides
@@ -230,6 +382,84 @@ class JSONAble:
     # to disable this option.
     __default_factory__: ClassVar[Optional[DefaultFactory]] = None
 
+    # Class level encoded-output cache, for frozen dataclasses only.
+    #
+    # The result of `json()` on a frozen dataclass can never change, so setting this
+    # option memoizes the encoded dictionary on the instance at the first `json()`
+    # call, and later calls return it directly. The value decides what is returned:
+    #
+    #   * "copy": a fresh copy of the cached dictionary (nested dicts and lists are
+    #     copied as well), callers are free to mutate it.
+    #   * "readonly": the cached dictionary, which is read-only (a dict subclass
+    #     raising TypeError on mutations, which `json.dumps` can serialize),
+    #     nested values are shared and must not be mutated.
+    #   * "shared": the cached dictionary itself, callers must not mutate it.
+    #
+    # Encoded as nested values of other dataclasses, the "readonly" and "shared"
+    # cached dictionaries are copied, as the parents' outputs are free to mutate.
+    #
+    # Defaults to `None`, which disables the cache.
+    __json_cache__: ClassVar[Optional[str]] = None
+
+    # Class level option to cache the result of `content_hash()` on the instance,
+    # for frozen dataclasses only. The hash is computed at the first call, and later
+    # calls return it directly. Defaults to False.
+    __json_hash_cache__: ClassVar[bool] = False
+
+    # Class level option to convert with an iterative engine.
+    #
+    # By default, nested dataclasses are converted by recursive calls of `json()` and
+    # `from_json()`, so very deep trees may hit the recursion limit. Setting this to
+    # True makes conversions of this class walk the nested `JSONAble` dataclasses with
+    # an explicit stack instead, which handles arbitrary depth. The nested fields
+    # typed `X`, `Optional[X]`, `List[X]`, `Tuple[X, ...]` or `Dict[str, X]` (where X
+    # is a `JSONAble` class, and without custom encoder or decoder) are walked,
+    # regardless of this option of X.
+    __json_iterative__: ClassVar[bool] = False
+
+    # Class level options for tagged unions.
+    #
+    # A field typed `Union[A, B, ...]`, where all the members are `JSONAble`
+    # classes declaring a `__json_tag__`, is converted as a tagged union: the tag
+    # of the value's class is encoded to the key `__json_tag_key__` of the output
+    # dictionary, and on decoding, the class to construct is looked up by this key's
+    # value in the input dictionary. The members must use the same tag key.
+    #
+    # Other unions are untagged, the value is decoded by trying the members in order,
+    # see `get_decoder`.
+    __json_tag_key__: ClassVar[str] = "type"
+    __json_tag__: ClassVar[Optional[str]] = None
+
+    def __class_getitem__(cls, params):
+        """Parameterizes a generic dataclass, e.g. `Page[Order]` of
+        `class Page(J, Generic[T])`. Returns a subclass of this class with the type
+        variables substituted, which has its own conversion plans, so that
+        `Page[Order].from_json(d)` decodes the items as `Order`. The instances it
+        decodes or constructs are of the generic class itself, e.g. `Page`.
+        The subclasses are cached per parameters.
+        Parameters with type variables left give the `typing` generic alias, as
+        usual.
+        """
+        try:
+            alias = super().__class_getitem__(params)  # type: ignore[misc]
+        except AttributeError:
+            raise TypeError(f"{cls.__name__} is not a generic class") from None
+        if getattr(alias, "__parameters__", None):
+            return alias
+        args = _get_generics_args(alias)
+
+        generics = cls.__dict__.get("__dataclass_jsonable_generics__")
+        if generics is not None and args in generics:
+            return generics[args]
+        with _build_lock:
+            generics = cls.__dict__.get("__dataclass_jsonable_generics__")
+            if generics is None:
+                generics = {}
+                setattr(cls, "__dataclass_jsonable_generics__", generics)
+            if args not in generics:
+                generics[args] = _make_generic_class(cls, args)
+            return generics[args]
+
     def _get_origin_json(self) -> JSON:
         """Debug purpose method to return the original JSON dictionary which constructs
         this instance via `from_json` method.
@@ -243,90 +473,87 @@ class JSONAble:
         Raises `NotImplementedError` if given type is not supported.
         You can override this function by declaring a subclass that extends `JSONAble`.
         """
-        if t is type(None):
+        kind = _get_hint_kind(t)
+        if kind == _KIND_SCALAR:
+            # bool, int, float and str.
+            return t
+        elif kind == _KIND_NONE:
             return _encode_None
-        elif t is bool:
-            return bool
-        elif t is str:
-            return str
-        elif t is int:
-            return int
-        elif t is float:
-            return float
-        elif t is Decimal:
+        elif kind == _KIND_DECIMAL:
             return str
-        elif t is datetime:
+        elif kind == _KIND_DATETIME:
             return _encode_datetime
-        elif t is date:
+        elif kind == _KIND_DATE:
             return _encode_date
-        elif t is timedelta:
+        elif kind == _KIND_TIMEDELTA:
             return _encode_timedelta
-        elif isinstance(t, type) and issubclass(t, Enum):
+        elif kind == _KIND_ENUM:
             return _encode_enum
-        elif t is Any:
+        elif kind == _KIND_TYPEVAR:
+            # Type variables not substituted, e.g. of an unparameterized generic
+            # dataclass, are treated as their bounds or Any.
+            return cls.get_encoder(t.__bound__ or Any)
+        elif kind == _KIND_ANY:
             # Any runs reflection encoding.
+            if _is_codec_default(cls, "get_encoder"):
+                return _encode_any
             return lambda x: cls.get_encoder(type(x))(x)
-        elif _is_jsonable_like(t):
+        elif kind == _KIND_NESTED:
             # Nested
+            if "__dataclass_jsonable_origin__" in t.__dict__:
+                # Parameterized generic, encodes by its own plans.
+                return lambda x: x._json(t._get_plan())  # type: ignore
             return _encode_jsonable
-        elif t is list:
-            # list of elements.
+        elif kind == _KIND_RECORD:
+            # Nested plain dataclass, NamedTuple or TypedDict.
+            adapter = _get_record_adapter(t)
+            if issubclass(t, dict):
+                return lambda x: _encode_typed_dict(x, adapter._get_plan())
+            return lambda x: JSONAble._json(x, adapter._get_plan())
+        elif kind == _KIND_LIST or kind == _KIND_SET:
+            # list / set of elements, encoded to a list.
             return lambda x: [cls.get_encoder(type(e))(e) for e in x]
-        elif t is set:
-            # set of elements
-            return lambda x: {cls.get_encoder(type(e))(e) for e in x}
-        elif t is dict:
+        elif kind == _KIND_DICT:
             # dict
             return _encode_dict
-        elif _is_generics(t) and _get_generics_origin(t) in {list, set}:
-            # List[E] / Set[E]
+        elif kind == _KIND_LIST_OF or kind == _KIND_TUPLE_OF:
+            # List[E] / Tuple[E, ...]
             args = _get_generics_args(t)
             f = cls.get_encoder(args[0])
             return lambda x: [f(e) for e in x]
-        elif _is_generics(t) and _get_generics_origin(t) is tuple:
+        elif kind == _KIND_SET_OF:
+            # Set[E] / FrozenSet[E], encoded to a list.
             args = _get_generics_args(t)
-            if len(args) == 2 and args[1] is Ellipsis:
-                # Tuple[E, ...]
-                f = cls.get_encoder(args[0])
-                return lambda x: [f(e) for e in x]
+            if args[0] in _JSON_SCALAR_TYPES and args[0] is not float:
+                # Elements are encoded as they are. Floats are converted, as the
+                # elements of Set[float] may be integers.
+                return list
+            f = cls.get_encoder(args[0])
+            return lambda x: [f(e) for e in x]
+        elif kind == _KIND_TUPLE_FIXED:
             # Tuple[E1, E2, E3]
+            args = _get_generics_args(t)
             return lambda x: [cls.get_encoder(args[i])(e) for i, e in enumerate(x)]
-        elif _is_generics(t) and _get_generics_origin(t) is dict:
+        elif kind == _KIND_DICT_OF:
             # Dict[K, E]
             args = _get_generics_args(t)
-            if args[0] is not str and args[0] != "str":
-                raise NotImplementedError("dict with non-str keys is not supported")
-            # Dict[str, E]
+            g = _get_dict_key_encoder(_eval_forward_ref(cls, args[0]))
             f = cls.get_encoder(args[1])
-            return lambda x: {str(k): f(v) for k, v in x.items()}
-        elif _is_generics(t) and _get_generics_origin(t) is Union:
-            # Union[A, B, C, D]
-            args = _get_generics_args(t)
-            if len(args) != 2 or args[1] is not type(None):
-                raise NotImplementedError("only Optional[X] union type is supported")
+            return lambda x: {g(k): f(v) for k, v in x.items()}
+        elif kind == _KIND_OPTIONAL:
             # Optional[E]
-            f = cls.get_encoder(args[0])
+            f = cls.get_encoder(_get_generics_args(t)[0])
             return lambda x: None if x is None else f(x)
-        elif isinstance(t, str):
-            # t is a string, not a type.
-            # That is a ForwardRef, we use the namespaces dict (globals) from
-            # the class's module.
-            # NOTE: for py<3.9, the module keyword argument is not available.
-            if sys.version_info.minor < 9:
-                return cls.get_encoder(ForwardRef(t))
-            return cls.get_encoder(ForwardRef(t, module=cls.__module__))  # type: ignore
-        elif isinstance(t, ForwardRef):
-            # ForwardRef("sometype")
+        elif kind == _KIND_UNION:
+            # Union[A, B, C, D]
+            return _get_union_encoder(cls, _get_generics_args(t))
+        elif kind == _KIND_FORWARD_REF:
+            # t is a string or ForwardRef("sometype"), not a type.
             # function `get_type_hints` would evaluate the ForwardRef types to real
             # python types. but there may be bugs in older python versions.
             # e.g. Python 3.10  https://bugs.python.org/issue41370
             # So we try to evaluate the ForwardRef if we meet one.
-            if sys.version_info.minor < 9:
-                globalns = sys.modules[cls.__module__].__dict__
-                return cls.get_encoder(t._evaluate(globalns, globalns))  # type: ignore
-            # after 3.9+ the globalns and locals respects to
-            # ForwardRef.__forwared_module__'s globalns
-            return cls.get_encoder(t._evaluate(None, None, frozenset()))  # type: ignore
+            return cls.get_encoder(_eval_forward_ref(cls, t))
         raise NotImplementedError(f"get_encoder not support type {t}")
 
     @classmethod
@@ -336,87 +563,88 @@ class JSONAble:
         Raises `NotImplementedError` if given type is not supported.
         You can override this function by declaring a subclass that extends `JSONAble`.
         """
-        if t is type(None):
+        kind = _get_hint_kind(t)
+        if kind == _KIND_SCALAR:
+            # bool, int, float and str.
+            return t
+        elif kind == _KIND_NONE:
             return _decode_None
-        elif t is bool:
-            return bool
-        elif t is str:
-            return str
-        elif t is int:
-            return int
-        elif t is float:
-            return float
-        elif t is Decimal:
+        elif kind == _KIND_DECIMAL:
             return _decode_decimal
-        elif t is datetime:
+        elif kind == _KIND_DATETIME:
             return _decode_datetime
-        elif t is date:
+        elif kind == _KIND_DATE:
             return _decode_date
-        elif t is timedelta:
+        elif kind == _KIND_TIMEDELTA:
             return _decode_timedelta
-        elif t is Any:
+        elif kind == _KIND_ENUM:
+            return t
+        elif kind == _KIND_TYPEVAR:
+            # Type variables not substituted, e.g. of an unparameterized generic
+            # dataclass, are treated as their bounds or Any.
+            return cls.get_decoder(t.__bound__ or Any)
+        elif kind == _KIND_ANY:
             # Any returns reflection decoding.
+            if _is_codec_default(cls, "get_decoder"):
+                return _decode_any
             return lambda x: cls.get_decoder(type(x))(x)
-        elif t is list:
+        elif kind == _KIND_NESTED:
+            # Nested
+            return lambda x: t.from_json(x)  # type: ignore
+        elif kind == _KIND_RECORD:
+            # Nested plain dataclass, NamedTuple or TypedDict.
+            return _get_record_adapter(t).from_json
+        elif kind == _KIND_LIST:
             # list of elements.
             return lambda x: [cls.get_decoder(type(e))(e) for e in x]
-        elif t is set:
-            # set of elements
-            return lambda x: {cls.get_decoder(type(e))(e) for e in x}
-        elif t is dict:
+        elif kind == _KIND_SET:
+            # set of elements, which are JSON scalars.
+            return t
+        elif kind == _KIND_DICT:
             # dict
             return _encode_dict
-        elif isinstance(t, type) and issubclass(t, Enum):
-            return t
-        elif _is_jsonable_like(t):
-            # Nested
-            return lambda x: t.from_json(x)  # type: ignore
-        elif _is_generics(t) and _get_generics_origin(t) is list:
+        elif kind == _KIND_LIST_OF:
             # List[E]
             args = _get_generics_args(t)
             f = cls.get_decoder(args[0])
             return lambda x: [f(e) for e in x]
-        elif _is_generics(t) and _get_generics_origin(t) is set:
-            # Set[E]
-            args = _get_generics_args(t)
-            f = cls.get_decoder(args[0])
+        elif kind == _KIND_SET_OF:
+            # Set[E] / FrozenSet[E]
+            ot = _get_generics_origin(t)
+            f = cls.get_decoder(_get_generics_args(t)[0])
+            if ot is frozenset:
+                return lambda x: frozenset(f(e) for e in x)
             return lambda x: {f(e) for e in x}
-        elif _is_generics(t) and _get_generics_origin(t) is tuple:
-            args = _get_generics_args(t)
-            if len(args) == 2 and args[1] is Ellipsis:
-                # Tuple[E, ...]
-                f = cls.get_decoder(args[0])
-                return lambda x: tuple(f(e) for e in x)
+        elif kind == _KIND_TUPLE_OF:
+            # Tuple[E, ...]
+            f = cls.get_decoder(_get_generics_args(t)[0])
+            return lambda x: tuple(f(e) for e in x)
+        elif kind == _KIND_TUPLE_FIXED:
             # Tuple[E1, E2, E3]
+            args = _get_generics_args(t)
             return lambda x: tuple(cls.get_decoder(args[i])(e) for i, e in enumerate(x))
-        elif _is_generics(t) and _get_generics_origin(t) is dict:
+        elif kind == _KIND_DICT_OF:
             # Dict[K, E]
             args = _get_generics_args(t)
-            if args[0] is not str and args[0] != "str":
-                raise NotImplementedError("dict with non-str keys is not supported")
-            # Dict[str, E]
+            g = _get_dict_key_decoder(_eval_forward_ref(cls, args[0]))
             f = cls.get_decoder(args[1])
-            return lambda x: {str(k): f(v) for k, v in x.items()}
-        elif _is_generics(t) and _get_generics_origin(t) is Union:
-            # Union[A, B, C, D]
-            args = _get_generics_args(t)
-            if len(args) != 2 or args[1] is not type(None):
-                raise NotImplementedError("only Optional[X] union type is supported")
+            return lambda x: {g(k): f(v) for k, v in x.items()}
+        elif kind == _KIND_OPTIONAL:
             # Optional[E]
-            f = cls.get_decoder(args[0])
+            f = cls.get_decoder(_get_generics_args(t)[0])
             return lambda x: None if x is None else f(x)
-        elif isinstance(t, str):
-            # String, consider it a ForwardRef.
-            if sys.version_info.minor < 9:
-                return cls.get_decoder(ForwardRef(t))
-            return cls.get_decoder(ForwardRef(t, module=cls.__module__))  # type: ignore
-        elif isinstance(t, ForwardRef):
-            # ForwardRef("sometype")
+        elif kind == _KIND_UNION:
+            # Union[A, B, C, D]
+            # Tagged unions look up the member by the tag in O(1). Untagged unions try
+            # the members in order, the first that decodes the value wins, where
+            # `bool`, `int`, `float` and `str` only accept values of the same JSON
+            # type. Per field, the member that decoded a value of the same shape
+            # (type, or key set for dictionaries) is tried first.
+            return _get_union_decoder(cls, _get_generics_args(t))
+        elif kind == _KIND_FORWARD_REF:
+            # String or ForwardRef("sometype")
             # https://bugs.python.org/issue41370
-            if sys.version_info.minor < 9:
-                globalns = sys.modules[cls.__module__].__dict__
-                return cls.get_decoder(t._evaluate(globalns, globalns))  # type: ignore
-            return cls.get_decoder(t._evaluate(None, None, frozenset()))  # type: ignore
+            return cls.get_decoder(_eval_forward_ref(cls, t))
         raise NotImplementedError(f"get_decoder not support type {t}")
 
     @classmethod
@@ -424,170 +652,1765 @@ class JSONAble:
         """Internal method to help to get the right json_options to use for given
         field `f`. For each field, we firstly checkout field-level json_options,
         if declared. And then the class-level json_options.
-        The result will be cached in this field's metadata as key
-        `_dataclass_jsonable_j`.
+        The results of all fields are built at the first call, and cached on this
+        class as attribute `__dataclass_jsonable_options__`. They can't be cached on
+        the fields, which are shared by a dataclass and its subclasses.
         """
-        k = "_dataclass_jsonable_j"
-
-        # Check cache at first.
-        if k in f.metadata:
-            return f.metadata[k]
+        table = cls.__dict__.get("__dataclass_jsonable_options__")
+        if table is None:
+            with _build_lock:
+                # Double check, another thread may have built it.
+                table = cls.__dict__.get("__dataclass_jsonable_options__")
+                if table is None:
+                    table = {
+                        name: _merge_json_options(
+                            cls.__default_json_options__, f.metadata.get("j")
+                        )
+                        for name, f in cls.__dataclass_fields__.items()
+                    }
+                    setattr(cls, "__dataclass_jsonable_options__", table)
+        return table[f.name]
 
-        # Initial json_options from class-level json_options.
-        options = cls.__default_json_options__
-
-        # Field-level declared json_options, may be None.
-        field_options = f.metadata.get("j")
+    @classmethod
+    def _get_plan(cls) -> List["_FieldPlan"]:
+        """Internal method to get the conversion plans of this dataclass's fields,
+        which resolve the type hint, json_options, keys and encoder/decoder functions
+        of each field once, to be shared by all conversions of this class.
+        ClassVar fields are excluded. The result is built at the first call, and
+        cached on this class as attribute `__dataclass_jsonable_plan__`.
+        """
+        plan = cls.__dict__.get("__dataclass_jsonable_plan__")
+        if plan is None:
+            with _build_lock:
+                # Double check, another thread may have built it.
+                plan = cls.__dict__.get("__dataclass_jsonable_plan__")
+                if plan is None:
+                    plan = cls._make_plan()
+                    # Publishes the plan only after it's completely built.
+                    setattr(cls, "__dataclass_jsonable_plan__", plan)
+        return plan
 
-        if field_options:
-            # Update options with field_options.
+    @classmethod
+    def _make_plan(cls) -> List["_FieldPlan"]:
+        """Internal method to build the conversion plans of this dataclass's fields,
+        see `_get_plan`.
+        The plans of the fields inherited from the base dataclass are reused if the
+        options and encoder/decoder overrides are the same, so only the type hints of
+        the fields declared by this class are resolved.
+        """
+        fields = cls.__dataclass_fields__
+
+        base = _get_plan_base(cls)
+        base_fields: Dict[str, Field] = {}
+        inherited: Dict[str, _FieldPlan] = {}
+        if base is not None:
+            base_fields = base.__dataclass_fields__
+            inherited = {
+                p.name: p
+                for p in base._get_plan()
+                if fields.get(p.name) is base_fields[p.name]
+            }
+
+        # Type hints loaded from a schema cache file, see `load_schema_cache`.
+        hints: Optional[Dict[str, TypingHint]] = cls.__dict__.get(
+            "__dataclass_jsonable_hints__"
+        )
+        plan = []
+        for name, f in fields.items():
+            p = inherited.get(name)
+            if p is not None:
+                plan.append(p)
+                continue
+            if base_fields.get(name) is f:
+                # Inherited ClassVar, excluded by the base.
+                continue
 
-            # kwds1 is arguments that were set in field_options.
-            kwds1 = {k: v for k, v in field_options.__dict__.items() if v is not None}
-            # kwds2 is arguments that were set at class-level.
-            kwds2 = {k: v for k, v in options.__dict__.items() if v is not None}
-            # kwds1 first (aka field-level options first).
-            kwds2.update(kwds1)
-            # And we should make a new json_options.
-            options = json_options(**kwds2)
+            if hints is None:
+                hints = (
+                    get_type_hints(cls) if base is None else _get_own_type_hints(cls)
+                )
+            if name not in hints:
+                # Declared by another base, e.g. multiple inheritance.
+                hints = get_type_hints(cls)
 
-        # Cache this result in field.metadata.
-        f.metadata = _replace_mapping_proxy(f.metadata, {k: options})
-        return options
+            t = hints[name]
+            if _is_class_var(t):
+                # ClassVar should be skipped.
+                continue
+            plan.append(_FieldPlan(cls, f, t, cls._get_json_options(f)))
+        return plan
 
     @classmethod
-    def _get_typing_hint_by_field(cls, f):
-        """Get typing hint for given field.
-        Notes that `f.type` may be a string or ForwardRef.
-        `get_type_hints` will evaluate them.
+    def projection(cls, *fields: str) -> "Projection":
+        """Returns the projection of this dataclass onto the fields of given names,
+        which converts only these fields, see `Projection`.
+        Projections are cached on this class per set of field names.
+        Raises `ValueError` if a name is not a field of this dataclass.
         """
-        return get_type_hints(cls)[f.name]
+        key = frozenset(fields)
+        projections = cls.__dict__.get("__dataclass_jsonable_projections__")
+        if projections is not None:
+            projection = projections.get(key)
+            if projection is not None:
+                return projection
+
+        projection = Projection(cls, key)
+        with _build_lock:
+            projections = cls.__dict__.get("__dataclass_jsonable_projections__")
+            if projections is None:
+                projections = {}
+                setattr(cls, "__dataclass_jsonable_projections__", projections)
+            return projections.setdefault(key, projection)
+
+    def json(
+        self,
+        memo: bool = False,
+        refs: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        canonical: bool = False,
+    ) -> JSON:
+        """Converts this dataclass instance to a dictionary recursively.
+
+        :param memo: if True, each nested `JSONAble` value shared by multiple fields
+           is encoded only once, and the encoded dictionary is reused. Raises
+           `ValueError` if a cycle is detected.
+        :param refs: if True, like `memo`, but the reused occurrences are encoded to
+           `{"$ref": "#/path/to/first/occurrence"}` (a JSON pointer) instead.
+        :param fields: if set, only encodes the fields of these names, see
+           `projection`. The other options and the encoded-output cache are ignored.
+        :param canonical: if True, encodes to the canonical form, which is the same
+           for equal values: the keys of dictionaries are sorted, floats with integral
+           values are encoded to integers, `Decimal` values are normalized (e.g.
+           "1.50" to "1.5"), and sets are sorted. The keys chosen on decoding, and
+           the other options except `fields` are ignored. See `content_hash`.
+
+        Both options `memo` and `refs` work on the nested values walked by the
+        iterative engine, see `__json_iterative__`.
+        """
+        if canonical:
+            plan = None if fields is None else self.projection(*fields).plan
+            return _encode_canonical(self, type(self), plan)
+        if fields is not None:
+            return self._json(self.projection(*fields).plan)
+        if memo or refs:
+            return _encode_iterative(self, memo=memo, refs=refs)
+        if self.__json_cache__ is not None:
+            return self._get_cached_json()
+        if self.__json_iterative__:
+            return _encode_iterative(self)
+        return self._json()
+
+    def _get_cached_json(self) -> JSON:
+        """Internal method to serve `json()` from the encoded-output cache, see
+        `__json_cache__`. The encoded dictionary is stored on this instance as
+        attribute `__dataclass_json_cache__`.
+        """
+        mode = self.__json_cache__
+        if mode not in _JSON_CACHE_MODES:
+            raise ValueError(f"invalid __json_cache__ {mode!r}")
+
+        d = self.__dict__.get("__dataclass_json_cache__")
+        if d is None:
+            if not self.__dataclass_params__.frozen:  # type: ignore[attr-defined]
+                raise TypeError("__json_cache__ requires a frozen dataclass")
+            d = _encode_iterative(self) if self.__json_iterative__ else self._json()
+            if mode == "readonly":
+                d = _ReadOnlyDict(d)
+            # The instance is frozen, bypasses its __setattr__.
+            object.__setattr__(self, "__dataclass_json_cache__", d)
+
+        if mode == "copy":
+            return _copy_json(d)
+        return d
 
-    def json(self) -> JSON:
-        """Converts this dataclass instance to a dictionary recursively."""
+    def content_hash(self) -> str:
+        """Returns the SHA-256 hex digest of the canonical JSON of this instance,
+        which is `json.dumps(self.json(canonical=True), separators=(",", ":"))`.
+        Equal instances have the same hash, e.g. to deduplicate or cache by content.
 
-        d: JSON = {}
+        The JSON text is fed to the hasher piece by piece, without building the
+        whole string. Raises `ValueError` for float values NaN or infinity.
+        Setting the class-level `__json_hash_cache__` caches the hash on frozen
+        instances.
+        """
+        if not self.__json_hash_cache__:
+            return _hash_canonical(self.json(canonical=True))
+
+        h = self.__dict__.get("__dataclass_json_hash__")
+        if h is None:
+            if not self.__dataclass_params__.frozen:  # type: ignore[attr-defined]
+                raise TypeError("__json_hash_cache__ requires a frozen dataclass")
+            h = _hash_canonical(self.json(canonical=True))
+            # The instance is frozen, bypasses its __setattr__.
+            object.__setattr__(self, "__dataclass_json_hash__", h)
+        return h
+
+    def _json(
+        self, plan: Optional[List["_FieldPlan"]] = None, d: Optional[JSON] = None
+    ) -> JSON:
+        """Internal method that does the encoding work of `json()`, bypassing the
+        encoded-output cache. Encodes only the fields in given `plan` if provided,
+        and into given dictionary `d` if provided, e.g. one holding a union tag.
+        """
+        if d is None:
+            d = {}
 
-        __name_choice_map = getattr(self, "__name_choice_map", None)
-        for name, f in self.__dataclass_fields__.items():
-            t = self._get_typing_hint_by_field(f)
-            if _is_class_var(t):
-                # ClassVar should be skipped.
-                continue
+        if plan is None:
+            plan = self._get_plan()
 
-            v = getattr(self, name)  # Field's value
-            options = self._get_json_options(f)
+        choice_map = getattr(self, "__name_choice_map", None)
+        for p in plan:
+            if p.skip:
+                continue
 
-            if options.skip:
+            v = getattr(self, p.name)  # Field's value
+            if v is MISSING:
+                # Not decoded, out of the projection, see `Projection`.
                 continue
 
-            if options.omitempty:
-                omitempty_tester = options.omitempty_tester or _default_omitempty_tester
-                if omitempty_tester(v):
+            omitempty = p.omitempty
+            if omitempty:
+                if omitempty == _OMITEMPTY_NONE:
+                    if v is None:
+                        continue
+                elif omitempty == _OMITEMPTY_FALSY:
+                    if not v:
+                        continue
+                elif p.omitempty_tester(v):
                     continue
 
             # Key in dictionary `d`.
-            k = _util_get_field_keys(
-                name=name,
-                options=options,
-                action=Action.ENCODING,
-                choice_map=__name_choice_map,
-            )[0]
+            # If the key was chosen on decoding, use the chosen key.
+            k = p.key
+            if choice_map and p.key_choosable and p.name in choice_map:
+                k = choice_map[p.name]
 
             # Encode.
-            if options.keep:
-                d[k] = v
-            else:
-                encoder = options.encoder or self.get_encoder(t)
-                d[k] = encoder(v)
+            d[k] = p.encoder(v)
 
         return d
 
     # An alias for `json`
     to_json = json
 
+    def json_into(self, target: JSON) -> JSON:
+        """Encodes this dataclass instance like `json()`, but into given dictionary
+        `target` in place, and returns it. The containers in `target` are reused
+        where possible: the dictionaries of nested `JSONAble` values, and the lists
+        of them, are refilled rather than reallocated.
+
+        This reduces allocations when encoding lots of instances of the same class
+        into the same target, e.g. in a hot loop that serializes each one right away.
+        `target` should be empty, or filled by previous `json_into` calls of
+        instances of this class. The values previously returned are overwritten,
+        the keys left by instances of other classes (e.g. other subclasses of a
+        nested field's class) are removed.
+        The encoded-output cache and the iterative engine are bypassed.
+        """
+        choice_map = getattr(self, "__name_choice_map", None)
+        # Number of keys encoded into `target`.
+        n = 0
+        for p in self._get_plan():
+            if p.skip:
+                continue
+
+            v = getattr(self, p.name)  # Field's value
+
+            k = p.key
+            if choice_map and p.key_choosable and p.name in choice_map:
+                k = choice_map[p.name]
+            if p.key_choosable and len(p.keys) > 1:
+                # Removes the other candidate keys, which the previous instances
+                # encoded into `target` may have chosen.
+                if k != p.key:
+                    target.pop(p.key, None)
+                for k1 in p.keys:
+                    if k1 != k:
+                        target.pop(k1, None)
+            if v is MISSING:
+                # Not decoded, out of the projection, see `Projection`.
+                target.pop(k, None)
+                continue
+
+            omitempty = p.omitempty
+            if omitempty:
+                if omitempty == _OMITEMPTY_NONE:
+                    omit = v is None
+                elif omitempty == _OMITEMPTY_FALSY:
+                    omit = not v
+                else:
+                    omit = p.omitempty_tester(v)
+                if omit:
+                    target.pop(k, None)
+                    continue
+
+            n += 1
+            nested = p.nested
+            if nested is not None and v is not None:
+                old = target.get(k)
+                if nested[0] == _NESTED_ONE:
+                    if type(old) is dict and _is_plan_walkable(type(v)):
+                        v.json_into(old)
+                        continue
+                elif nested[0] != _NESTED_DICT and type(old) is list:
+                    _json_list_into(v, old)
+                    continue
+
+            target[k] = p.encoder(v)
+
+        if len(target) > n:
+            # Other keys are left, the ones of this class are either encoded or
+            # removed above.
+            keys = _get_plan_keys(type(self))
+            for k in [k for k in target if k not in keys]:
+                del target[k]
+        return target
+
     @classmethod
-    def from_json(cls: Type[T], d: JSON) -> T:
-        """Constructs an instance of this dataclass from given jsonable dictionary."""
+    def iter_json(cls: Type[T], objs: Iterable[T]) -> Iterator[JSON]:
+        """Encodes given instances of this dataclass one by one, yields the encoded
+        dictionaries. The same dictionary is reused and refilled by `json_into`
+        for every instance, so each one must be consumed (e.g. serialized to a
+        string) before the next one is taken:
+
+            for d in Person.iter_json(people):
+                f.write(json.dumps(d) + "\\n")
+        """
+        target: JSON = {}
+        for obj in objs:
+            yield obj.json_into(target)  # type: ignore[attr-defined]
 
+    @classmethod
+    def from_json(cls: Type[T], d: JSON, fields: Optional[Iterable[str]] = None) -> T:
+        """Constructs an instance of this dataclass from given jsonable dictionary.
+
+        :param fields: if set, only decodes the fields of these names, see
+           `projection`.
+
+        Raises `DecodeError` if decoding fails, which wraps the original error and
+        locates the failing field, e.g. `owner.creators[3].registered_at`.
+        """
         # Arguments for class `cls()`.
-        kwds = {}
+        kwds: Dict[str, V] = {}
+
+        if fields is None:
+            if cls.__json_iterative__:
+                return _decode_iterative(cls, d)
+            plan = cls._get_plan()
+        else:
+            projection = cls.projection(*fields)  # type: ignore[attr-defined]
+            plan = projection.plan
+            if cls.__default_factory__ is None:
+                kwds = dict.fromkeys(projection.missing, MISSING)
 
         _name_choice_map = {}
 
-        for name, f in cls.__dataclass_fields__.items():
-            t = cls._get_typing_hint_by_field(f)
-            if _is_class_var(t):
-                # ClassVar should be skipped.
-                continue
+        # The field being decoded, to locate errors.
+        p = None
+        try:
+            for p in plan:
+                if p.skip:
+                    continue
 
-            options = cls._get_json_options(f)
+                # Find the first key in dictionary `d` that is in candidate keys.
+                for k in p.keys:
+                    if k in d:
+                        # record the key in dictionary `d` for this field.
+                        _name_choice_map[p.name] = k
+                        # Value in dictionary `d`.
+                        v = d[k]
+                        break
+                else:
+                    # Key is missing in dictionary.
+                    if p.default_before_decoding is None:
+                        # Just continue going if the value is missing.
+                        # A DecodeTypeError of "missing 1 required positional argument"
+                        # will be raised if this field doesn't have a default value
+                        # declared.
+                        continue
+                    # Gives a default value before decoding.
+                    v = p.default_before_decoding
+
+                if p.omitempty:
+                    # Omit if the value from dictionary is empty.
+                    if p.omitempty == _OMITEMPTY_TESTER:
+                        if p.omitempty_tester(v):
+                            continue
+                    elif not v:
+                        continue
 
-            # Key in dictionary.
-            ks = _util_get_field_keys(name, options, Action.DECODING)
-            if options.skip:
+                # Call hook function if provided.
+                if p.before_decoder:
+                    v = p.before_decoder(v)
+
+                kwds[p.name] = p.decoder(v)
+
+            p = None
+            return cls._construct(d, kwds, _name_choice_map)
+        except DecodeError as e:
+            # Raised by a nested from_json, the outermost call sets the root.
+            e.root = d
+            raise
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            key = None if p is None else _name_choice_map.get(p.name, p.key)
+            raise _make_decode_error(e, d, key) from e
+
+    @classmethod
+    def _construct(cls: Type[T], d: JSON, kwds: Dict[str, V], choice_map: JSON) -> T:
+        """Internal method to construct an instance of this dataclass with decoded
+        arguments `kwds`, which were decoded from dictionary `d`.
+        """
+        # Interns strings if decoding within a DecodeContext.
+        ctx = _decode_context.get()
+        if ctx is not None and ctx.intern_strings:
+            ctx._intern_strings(cls, kwds)
+
+        # Sets default value.
+        if cls.__default_factory__ is not None:
+            for p in cls._get_plan():
+                if p.required and p.name not in kwds:
+                    kwds[p.name] = cls.__default_factory__(p.t)
+
+        origin = cls.__dict__.get("__dataclass_jsonable_origin__")
+        if origin is not None and not issubclass(origin, JSONAble):
+            # Adapter of a plain dataclass, NamedTuple or TypedDict, see
+            # `_get_record_adapter`. Its instances can't hold the debug attributes.
+            for name in cls.__dict__["__dataclass_jsonable_no_init__"]:
+                # Fields with init=False are encoded but not passed to __init__.
+                kwds.pop(name, None)
+            return origin(**kwds)
+
+        # Parameterized generics construct instances of the generic class.
+        inst = (origin or cls)(**kwds)
+        # Bypasses __setattr__, which raises for frozen dataclasses.
+        object.__setattr__(inst, "__dataclass_origin_json__", d)
+        object.__setattr__(inst, "__name_choice_map", choice_map)
+
+        if ctx is not None and ctx.dedup:
+            # Reuses an equal instance decoded before within this DecodeContext.
+            return ctx._dedup(inst)
+        return inst
+
+    def to_bytes(self) -> bytes:
+        """Converts this dataclass instance to a compact binary form, which can be
+        converted back by `from_bytes`.
+
+        The binary form holds the same values as `json()`'s, but the fields of
+        nested `JSONAble` values are written by position rather than by key. Integers
+        are written as varints, and strings are length-prefixed. It starts with a
+        fingerprint of the fields' keys and types of this class and its nested
+        classes, `from_bytes` refuses the data written by a different schema.
+        """
+        cls = type(self)
+        out = bytearray(_BINARY_MAGIC)
+        out += _get_binary_fingerprint(cls)
+        _binary_write_object(out, self.json(), cls)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls: Type[T], b: bytes) -> T:
+        """Constructs an instance of this dataclass from given binary form, made by
+        `to_bytes`. Raises `ValueError` if it's made by a different schema, or it's
+        truncated or corrupt.
+        """
+        header = _BINARY_MAGIC + _get_binary_fingerprint(cls)
+        if b[: len(header)] != header:
+            raise ValueError(f"binary data is not of the schema of {cls.__name__}")
+        try:
+            d, pos = _binary_read_object(b, len(header), cls)
+        except (IndexError, struct.error) as e:
+            raise ValueError("truncated binary data") from e
+        if pos > len(b):
+            # Strings are read by slicing, which doesn't fail.
+            raise ValueError("truncated binary data")
+        if pos != len(b):
+            raise ValueError("unexpected trailing bytes in binary data")
+        return cls.from_json(d)  # type: ignore[attr-defined]
+
+    @classmethod
+    def from_json_many(
+        cls: Type[T], ds: Iterable[JSON], context: Optional["DecodeContext"] = None
+    ) -> List[T]:
+        """Constructs a list of instances of this dataclass from given jsonable
+        dictionaries. Decodes within given `context` if provided, see `DecodeContext`.
+        """
+        if context is None:
+            return [cls.from_json(d) for d in ds]
+        with context:
+            return [cls.from_json(d) for d in ds]
+
+    @classmethod
+    def from_json_batch(
+        cls: Type[T],
+        ds: Iterable[JSON],
+        context: Optional["DecodeContext"] = None,
+        max_errors: Optional[int] = None,
+    ) -> Tuple[List[T], List[DecodeError]]:
+        """Like `from_json_many`, but the records failed to decode don't abort the
+        batch, they are skipped instead. Returns the pair of the decoded instances
+        and the errors, each error's `index` is set to the record's index in `ds`.
+
+        :param max_errors: if set, only the first `max_errors` errors are kept, the
+           later bad records are still skipped.
+        """
+        objs: List[T] = []
+        errors: List[DecodeError] = []
+        with context if context is not None else nullcontext():
+            for i, d in enumerate(ds):
+                try:
+                    objs.append(cls.from_json(d))  # type: ignore[attr-defined]
+                except _DECODE_VALUE_ERRORS as e:
+                    # `NotImplementedError` of the schema errors fails fast.
+                    if max_errors is not None and len(errors) >= max_errors:
+                        continue
+                    if not isinstance(e, DecodeError):
+                        e = _make_decode_error(e, d, None)
+                    e.index = i
+                    errors.append(e)
+        return objs, errors
+
+    @classmethod
+    def iter_json_array(
+        cls: Type[T],
+        fileobj: IO,
+        path: Optional[str] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[T]:
+        """Decodes the elements of a JSON array in file `fileobj` one by one, and
+        yields the instances of this dataclass. The file is read incrementally in
+        chunks of `chunk_size`, so only an element at a time is in memory.
+
+        :param fileobj: a text or binary (UTF-8) file object.
+        :param path: if set, the array is at this dotted path of keys in the
+           top-level JSON object, e.g. "data.items". The values before it are skipped
+           without being decoded.
+        """
+        reader = _JSONArrayReader(fileobj, chunk_size)
+        for d in reader.iter_array(path.split(".") if path else []):
+            yield cls.from_json(d)  # type: ignore[attr-defined]
+
+    @classmethod
+    def to_columns(
+        cls: Type[T], objs: Iterable[T], arrays: bool = False
+    ) -> Dict[str, V]:
+        """Encodes given instances of this dataclass to a columnar dictionary, which
+        maps each field's key to the list of this field's encoded values, in order.
+        The keys and encoders are the same as `json()`'s, except that option
+        `omitempty` and the keys chosen via `name_choice` are ignored, so that all
+        columns are aligned.
+        If `arrays` is True, the columns of `int` and `float` fields without custom
+        encoders are made `array.array` instead of `list`.
+        """
+        if not isinstance(objs, (list, tuple)):
+            objs = list(objs)
+
+        columns: Dict[str, V] = {}
+        for p in cls._get_plan():
+            if p.skip:
                 continue
+            column: V = list(map(p.encoder, map(attrgetter(p.name), objs)))
+            typecode = _ARRAY_TYPECODES.get(p.t) if arrays else None
+            if typecode is not None and p.encoder is p.t:
+                try:
+                    column = array(typecode, column)
+                except OverflowError:
+                    # Too large integers, keep it a list.
+                    pass
+            columns[p.key] = column
+        return columns
 
-            # Find the first key in dictionary `d` that is in `ks`.
-            k = None
-            for _k in ks:
-                if _k in d:
-                    k = _k
-                    # record the key in dictionary `d` for this field.
-                    _name_choice_map[name] = k
+    @classmethod
+    def from_columns(cls: Type[T], columns: Mapping[str, V]) -> List[T]:
+        """Constructs a list of instances of this dataclass from given columnar
+        dictionary, the inverse of `to_columns`. Each column is decoded as a whole,
+        option `omitempty` is ignored. The instances are constructed like the ones
+        of `from_json`, each one's origin dictionary is its row.
+        Raises `ValueError` if the columns are not of the same length, and
+        `DecodeError` if decoding fails, whose `index` is the failing row's.
+        """
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("columns are not of the same length")
+        n = lengths.pop() if lengths else 0
+
+        names, values = [], []
+        # Keys of the columns decoded, and their raw values, for the origin
+        # dictionaries of the rows.
+        keys, raws = [], []
+        choice_map = {}
+
+        for p in cls._get_plan():
+            if p.skip:
+                continue
+
+            for k in p.keys:
+                if k in columns:
+                    column = columns[k]
+                    keys.append(k)
+                    raws.append(column)
+                    choice_map[p.name] = k
                     break
+            else:
+                if p.default_before_decoding is None:
+                    # Required ones are given by the default_factory, see
+                    # `_construct`.
+                    continue
+                column = [p.default_before_decoding] * n
+
+            if p.before_decoder:
+                column = map(p.before_decoder, column)
+            decoded: List[V] = []
+            try:
+                decoded.extend(map(p.decoder, column))
+            except NotImplementedError:
+                raise
+            except Exception as e:
+                err = _make_decode_error(e, columns, choice_map.get(p.name, p.key))
+                # The values decoded are kept by `extend`.
+                err.index = len(decoded)
+                raise err from e
+            names.append(p.name)
+            values.append(decoded)
+
+        insts = []
+        rows = zip(
+            zip(*values) if values else [()] * n, zip(*raws) if raws else [()] * n
+        )
+        for i, (row, raw) in enumerate(rows):
+            d = dict(zip(keys, raw))
+            try:
+                insts.append(cls._construct(d, dict(zip(names, row)), choice_map))
+            except NotImplementedError:
+                raise
+            except Exception as e:
+                err = _make_decode_error(e, d, None)
+                err.index = i
+                raise err from e
+        return insts
 
-            if k is None:
-                # Key is missing in dictionary.
-                default = options.default_before_decoding
-                if default is not None:
-                    # Gives a default value before decoding.
-                    v = default
-                else:
-                    # Just continue going if the value is missing.
-                    # An error like "missing 1 required positional argument" will be
-                    # raised if this field doesn't have a default value declared.
+
+J = JSONAble  # short alias
+
+
+class DecodeContext:
+    """Context to reduce memory usage of decoded objects, by sharing the duplicate
+    values among them. All `from_json` calls (including the nested ones) within a
+    `with` block of this context are affected:
+
+        with DecodeContext():
+            people = [Person.from_json(d) for d in ds]
+
+    Or pass it to the batch decoding method `from_json_many`:
+
+        people = Person.from_json_many(ds, context=DecodeContext())
+
+    A context can be reused across multiple batches to share values among them.
+
+    :param intern_strings: whether to intern decoded strings, defaults to True.
+       Strings decoded onto the same field (and the string elements of list fields)
+       that are equal are replaced with a single shared instance.
+    :param intern_max_length: only strings not longer than this are interned.
+    :param intern_maxsize: max number of distinct strings to intern per field.
+    :param dedup: whether to deduplicate decoded frozen dataclass instances, defaults
+       to True. A decoded instance equal to a previously decoded one is replaced with
+       the previous one. Notes that the `_get_origin_json()` of a deduplicated
+       instance is the dictionary it was first decoded from.
+    :param dedup_maxsize: max number of instances to remember, the least recently
+       used ones are dropped first.
+    """
+
+    def __init__(
+        self,
+        intern_strings: bool = True,
+        intern_max_length: int = 64,
+        intern_maxsize: int = 65536,
+        dedup: bool = True,
+        dedup_maxsize: int = 4096,
+    ) -> None:
+        self.intern_strings = intern_strings
+        self.intern_max_length = intern_max_length
+        self.intern_maxsize = intern_maxsize
+        self.dedup = dedup
+        self.dedup_maxsize = dedup_maxsize
+        # Interned strings table for each (class, field name).
+        self._strings: Dict[Tuple[type, str], Dict[str, str]] = {}
+        # Deduplicated instances, in LRU order.
+        self._objects: "OrderedDict[Any, Any]" = OrderedDict()
+        # Tokens to reset the context variable, supports nested `with` blocks.
+        self._tokens: List[Any] = []
+
+    def __enter__(self) -> "DecodeContext":
+        self._tokens.append(_decode_context.set(self))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _decode_context.reset(self._tokens.pop())
+
+    def _intern(self, table: Dict[str, str], s: str) -> str:
+        if len(s) > self.intern_max_length:
+            return s
+        v = table.get(s)
+        if v is not None:
+            return v
+        if len(table) < self.intern_maxsize:
+            table[s] = s
+        return s
+
+    def _intern_strings(self, cls: type, kwds: Dict[str, V]) -> None:
+        """Interns the strings in decoded arguments `kwds` of class `cls`."""
+        for name, v in kwds.items():
+            if type(v) is str:
+                table = self._strings.setdefault((cls, name), {})
+                kwds[name] = self._intern(table, v)
+            elif type(v) is list and v and type(v[0]) is str:
+                table = self._strings.setdefault((cls, name), {})
+                kwds[name] = [
+                    self._intern(table, e) if type(e) is str else e for e in v
+                ]
+
+    def _dedup(self, inst: T) -> T:
+        """Returns a previously decoded instance that equals to `inst`, or remembers
+        `inst` if there's no such one. Only frozen dataclasses are deduplicated.
+        """
+        if not inst.__dataclass_params__.frozen:  # type: ignore[attr-defined]
+            return inst
+        try:
+            prev = self._objects.get(inst)
+        except TypeError:
+            # Unhashable, e.g. has list fields.
+            return inst
+        if prev is not None:
+            self._objects.move_to_end(prev)
+            return prev
+        self._objects[inst] = inst
+        if len(self._objects) > self.dedup_maxsize:
+            self._objects.popitem(last=False)
+        return inst
+
+
+class Projection:
+    """Projection of a `JSONAble` dataclass onto a subset of its fields, made by
+    `projection`, to convert only these fields:
+
+        projection = Person.projection("id", "name")
+        person = projection.from_json(d)
+        d = projection.json(person)
+
+    Which is equivalent to `Person.from_json(d, fields=...)` and
+    `person.json(fields=...)`. The fields not projected are not decoded, and they
+    are left to their default values. Those without defaults are left to
+    `dataclasses.MISSING`, unless the class-level `__default_factory__` is set.
+    Fields left to `dataclasses.MISSING` are omitted on encoding.
+    """
+
+    def __init__(self, cls: Type[JSONAble], fields: FrozenSet[str]) -> None:
+        unknown = fields - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"unknown fields {sorted(unknown)} of {cls.__name__}")
+        self.cls = cls
+        self.fields = fields
+        plan = cls._get_plan()
+        # Plans of the fields projected.
+        self.plan = [p for p in plan if p.name in fields]
+        # Names of the required fields not projected.
+        self.missing = [p.name for p in plan if p.required and p.name not in fields]
+
+    def from_json(self, d: JSON) -> Any:
+        return self.cls.from_json(d, fields=self.fields)
+
+    def json(self, obj: JSONAble) -> JSON:
+        return obj._json(self.plan)
+
+
+class _JSONArrayReader:
+    """Incremental reader of a JSON array in a file, for `iter_json_array`.
+    The text read is kept in a buffer `buf`, of which the part before `pos` is
+    consumed, and dropped on the next read.
+    """
+
+    def __init__(self, fileobj: IO, chunk_size: int) -> None:
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        # Decodes UTF-8 bytes incrementally for binary files.
+        self.bytes_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def read(self, size: Optional[int] = None) -> bool:
+        """Drops the consumed text and reads more. Returns False on EOF."""
+        if self.eof:
+            return False
+        while True:
+            chunk = self.fileobj.read(size or self.chunk_size)
+            if not isinstance(chunk, bytes):
+                break
+            text = self.bytes_decoder.decode(chunk, final=not chunk)
+            # Empty text before EOF means a partial character was read, reads more.
+            if text or not chunk:
+                chunk = text
+                break
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, msg: str) -> ValueError:
+        return ValueError(f"{msg} in JSON array stream")
+
+    def skip_whitespace(self) -> str:
+        """Skips whitespaces, returns the next char, or "" on EOF."""
+        while True:
+            m = _JSON_WHITESPACE_RE.match(self.buf, self.pos)
+            self.pos = m.end()  # type: ignore[union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.read():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.skip_whitespace()
+        if not c or c not in chars:
+            raise self.error(f"expecting one of {chars!r}, got {c!r}")
+        self.pos += 1
+        return c
+
+    def decode_value(self) -> V:
+        """Decodes the next value."""
+        self.skip_whitespace()
+        while True:
+            try:
+                v, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # The value may be incomplete if it fails at the buffer end, e.g.
+                # "tru" of "true", or in a string not terminated yet. Otherwise it's
+                # invalid, raises rather than reading the rest of the file.
+                incomplete = e.pos >= len(self.buf) - _JSON_PARTIAL_TOKEN_SIZE
+                if not incomplete and not e.msg.startswith("Unterminated string"):
+                    raise
+                # Reads more, at least doubles the buffer to not reparse too many
+                # times for large values.
+                if self.read(max(self.chunk_size, len(self.buf) - self.pos)):
+                    continue
+                raise
+            if end == len(self.buf) and self.read():
+                # A number at the buffer end may be incomplete, e.g. "12" of "123".
+                continue
+            self.pos = end
+            return v
+
+    def skip_value(self) -> None:
+        """Skips the next value without decoding it."""
+        c = self.skip_whitespace()
+        if c not in ("[", "{"):
+            self.decode_value()
+            return
+
+        depth = 0
+        while True:
+            m = _JSON_STRUCTURE_RE.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self.read():
+                    raise self.error("unexpected EOF")
+                continue
+            c = m.group()
+            if c == '"':
+                end = _JSON_STRING_END_RE.match(self.buf, m.end())
+                if end is None:
+                    # The string is incomplete, reads more.
+                    self.pos = m.start()
+                    if not self.read():
+                        raise self.error("unexpected EOF")
                     continue
+                self.pos = end.end()
+            elif c in "[{":
+                self.pos = m.end()
+                depth += 1
             else:
-                # Value in dictionary `d`.
-                v = d[k]
+                self.pos = m.end()
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def iter_array(self, keys: List[str]) -> Iterator[V]:
+        """Walks into the value at `keys` of the top-level object, which must be an
+        array, and yields its elements one by one.
+        """
+        for key in keys:
+            self.expect("{")
+            while True:
+                if self.skip_whitespace() == "}":
+                    raise self.error(f"key {key!r} not found")
+                k = self.decode_value()
+                self.expect(":")
+                if k == key:
+                    break
+                self.skip_value()
+                if self.expect(",}") == "}":
+                    raise self.error(f"key {key!r} not found")
+
+        self.expect("[")
+        if self.skip_whitespace() == "]":
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(",]") == "]":
+                return
+
+
+_JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+# Max size of a partial token at the buffer end, e.g. "\u12" of "\u1234".
+_JSON_PARTIAL_TOKEN_SIZE = 6
+_JSON_STRUCTURE_RE = re.compile(r'["\[\]{}]')
+_JSON_STRING_END_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+class JSONAbleFile:
+    """Random access reader of a JSONL file, each line of which is a dictionary
+    encoded from an instance of the dataclass `cls`. The file is memory-mapped, and
+    the lines are decoded on demand:
+
+        with JSONAbleFile(Event, "events.jsonl") as events:
+            n = len(events)
+            event = events[42]
+            some = events[100:200]
+
+    An index of the line offsets is built on opening, by scanning the file once.
+    Blank lines are ignored.
+
+    :param index_path: if set, the index is persisted to this path, and reused on
+       later openings as long as the JSONL file's size and modification time are
+       unchanged.
+    :param cache_size: max number of decoded instances to keep, the least recently
+       used ones are dropped first.
+    """
 
-            if options.omitempty:
-                # Omit if the value from dictionary is empty.
-                omitempty_tester = options.omitempty_tester or _default_omitempty_tester
-                if omitempty_tester(v):
-                    continue
+    def __init__(
+        self,
+        cls: Type[T],
+        path: str,
+        index_path: Optional[str] = None,
+        cache_size: int = 1024,
+    ) -> None:
+        self.cls = cls
+        self.path = path
+        self.cache_size = cache_size
+        # Decoded instances, in LRU order.
+        self._cache: "OrderedDict[int, Any]" = OrderedDict()
+
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._mm: Optional[mmap.mmap] = None
+        if stat.st_size > 0:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Offsets of the lines, plus the file size at the end.
+        self._offsets: array = self._load_index(index_path, stat)
+
+    def _load_index(self, index_path: Optional[str], stat: os.stat_result) -> array:
+        """Loads the index from `index_path` if it's valid, else builds it, and saves
+        it to `index_path` if provided. The persisted index starts with the size and
+        modification time of the JSONL file it was built from, and ends with the size.
+        A corrupt or truncated index is treated as stale.
+        """
+        header = (stat.st_size, stat.st_mtime_ns)
+        if index_path is not None and os.path.exists(index_path):
+            offsets = array("q")
+            with open(index_path, "rb") as f:
+                data = f.read()
+            if len(data) % offsets.itemsize == 0:
+                offsets.frombytes(data)
+                if tuple(offsets[:2]) == header and (
+                    len(offsets) == 2 or offsets[-1] == stat.st_size
+                ):
+                    return offsets[2:]
+
+        offsets = self._build_index()
+        if index_path is not None:
+            with open(index_path, "wb") as f:
+                array("q", header).tofile(f)
+                offsets.tofile(f)
+        return offsets
+
+    def _build_index(self) -> array:
+        offsets = array("q")
+        mm = self._mm
+        if mm is not None:
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end < 0:
+                    end = size
+                # Skips blank lines, a line starting with "{" isn't.
+                if mm[start] == 0x7B or mm[start:end].strip():
+                    offsets.append(start)
+                start = end + 1
+            offsets.append(size)
+        return offsets
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(j) for j in range(len(self))[i]]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("JSONAbleFile index out of range")
+        return self._get(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def _get(self, i: int) -> Any:
+        cache = self._cache
+        obj = cache.get(i)
+        if obj is not None:
+            cache.move_to_end(i)
+            return obj
+        line = self._mm[self._offsets[i] : self._offsets[i + 1]]  # type: ignore
+        obj = self.cls.from_json(json.loads(line))  # type: ignore[attr-defined]
+        if self.cache_size > 0:
+            cache[i] = obj
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return obj
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "JSONAbleFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def dump_schema_cache(path: str, classes: Iterable[Type[JSONAble]]) -> int:
+    """Exports the resolved schemas of given dataclasses to a cache file at `path`,
+    which can be loaded by `load_schema_cache` on startup, to skip the type hints
+    evaluation and options merging of these classes.
+
+    A schema consists of the type hints and the json_options of the fields, and
+    they are pickled, so the classes and functions they refer to are saved by
+    their qualified names. Classes that can't be pickled, e.g. that use lambda
+    functions as options, are skipped. Returns the number of classes exported.
+    """
+    entries = []
+    for cls in classes:
+        plan = cls._get_plan()
+        hints = {p.name: p.t for p in plan}
+        options = {
+            name: cls._get_json_options(f)
+            for name, f in cls.__dataclass_fields__.items()
+            if name in hints
+        }
+        entry = (cls, _get_schema_fingerprint(cls), hints, options)
+        try:
+            entries.append(pickle.dumps(entry))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # E.g. a lambda or local class in the options.
+            continue
+
+    with open(path, "wb") as f:
+        pickle.dump((_SCHEMA_CACHE_VERSION, sys.version_info[:2], entries), f)
+    return len(entries)
+
+
+def load_schema_cache(path: str) -> int:
+    """Loads a cache file exported by `dump_schema_cache`, and installs the schemas
+    to the dataclasses. Call this after the dataclasses are imported.
+
+    A schema is skipped if its class's annotations or json_options changed since
+    the export, or it can't be loaded, e.g. the class was renamed. The whole file is
+    ignored if it was exported by another Python version, or it's corrupt or
+    truncated. Returns the number of classes installed.
+
+    NOTE: The file is loaded by `pickle`, only load files you trust.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return 0
+    with f:
+        try:
+            version, python, entries = pickle.load(f)
+            python = tuple(python)
+        except _UNPICKLING_ERRORS:
+            # Corrupt or truncated file, rebuilt by the next dump.
+            return 0
+    if version != _SCHEMA_CACHE_VERSION or python != sys.version_info[:2]:
+        return 0
+
+    n = 0
+    for data in entries:
+        try:
+            cls, fingerprint, hints, options = pickle.loads(data)
+        except _UNPICKLING_ERRORS:
+            continue
+        if fingerprint != _get_schema_fingerprint(cls):
+            continue
+        with _build_lock:
+            if "__dataclass_jsonable_plan__" in cls.__dict__:
+                # Already built.
+                continue
+            if "__dataclass_jsonable_options__" not in cls.__dict__:
+                table = {
+                    name: options.get(name) or cls.__default_json_options__
+                    for name in cls.__dataclass_fields__
+                }
+                setattr(cls, "__dataclass_jsonable_options__", table)
+            setattr(cls, "__dataclass_jsonable_hints__", hints)
+        n += 1
+    return n
+
+
+# Format version of schema cache files.
+_SCHEMA_CACHE_VERSION = 1
+
+# Errors of loading a corrupt or stale schema cache file, e.g. a renamed class.
+_UNPICKLING_ERRORS = (
+    pickle.UnpicklingError,
+    EOFError,
+    ImportError,
+    AttributeError,
+    LookupError,
+    TypeError,
+    ValueError,
+    OverflowError,
+)
+
+
+def _get_schema_fingerprint(cls) -> str:
+    """Returns a fingerprint of the declarations that the schema of dataclass `cls`
+    is resolved from: the annotations of it and its bases, the class-level and the
+    field-level json_options.
+    """
+    parts = []
+    for c in cls.__mro__:
+        if c is JSONAble:
+            break
+        annotations = c.__dict__.get("__annotations__")
+        if annotations:
+            parts.append(f"{c.__module__}.{c.__qualname__}")
+            parts.extend(f"{k}:{_get_stable_repr(v)}" for k, v in annotations.items())
+    parts.append(_get_stable_repr(cls.__default_json_options__))
+    for name, f in cls.__dataclass_fields__.items():
+        if "j" in f.metadata:
+            parts.append(f"{name}:{_get_stable_repr(f.metadata['j'])}")
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def _get_stable_repr(v: V) -> str:
+    """Returns a repr of `v` that's stable across processes, e.g. functions are
+    represented by their qualified names rather than addresses.
+    """
+    if isinstance(v, json_options):
+        return repr(
+            [(k, _get_stable_repr(x)) for k, x in v.__dict__.items() if x is not None]
+        )
+    if callable(v) and not isinstance(v, type) and hasattr(v, "__qualname__"):
+        return f"{v.__module__}.{v.__qualname__}"
+    return repr(v)
+
+
+# Lock to build the per-class cached options and plans only once, which may be
+# reentered, e.g. building a plan gets the options.
+_build_lock = threading.RLock()
+
+# The DecodeContext currently in use.
+_decode_context: ContextVar[Optional[DecodeContext]] = ContextVar(
+    "dataclass_jsonable_decode_context", default=None
+)
 
-            # Call hook function if provided.
-            if options.before_decoder:
-                v = options.before_decoder(v)
 
-            # Obtain the decoder function.
-            if options.keep:
-                kwds[name] = v
+class _FieldPlan:
+    """Conversion plan of a dataclass field, resolved once for a class."""
+
+    __slots__ = (
+        "name",
+        "t",
+        "options",
+        "skip",
+        "omitempty",
+        "omitempty_tester",
+        "default_before_decoding",
+        "before_decoder",
+        "required",
+        "key",
+        "keys",
+        "key_choosable",
+        "encoder",
+        "decoder",
+        "nested",
+        "canonical_encoder",
+    )
+
+    def __init__(self, cls, f: Field, t: TypingHint, options: json_options) -> None:
+        self.name = f.name
+        self.t = t
+        self.options = options
+
+        self.skip = bool(options.skip)
+        # How to test empty values for option omitempty, 0 for not omitempty.
+        self.omitempty = 0
+        self.omitempty_tester = options.omitempty_tester or not_
+        if options.omitempty:
+            if options.omitempty_tester is not None:
+                self.omitempty = _OMITEMPTY_TESTER
             else:
-                decoder = options.decoder or cls.get_decoder(t)
-                kwds[name] = decoder(v)
+                self.omitempty = _get_omitempty_mode(cls, t)
+        self.default_before_decoding = options.default_before_decoding
+        self.before_decoder = options.before_decoder
+        # Whether this field has no default value or default_factory declared.
+        # Fields with init=False are never given to the constructor.
+        self.required = f.init and f.default is MISSING and f.default_factory is MISSING
+
+        # Key in dictionary on encoding, and the candidate keys on decoding.
+        self.key = _util_get_field_keys(f.name, options, Action.ENCODING)[0]
+        self.keys = _util_get_field_keys(f.name, options, Action.DECODING)
+        # Whether the encoding key can be replaced by the key chosen on decoding.
+        self.key_choosable = not options.name
+
+        # Shape of nested JSONAble values, for the iterative engine.
+        self.nested: Optional[Tuple[int, bool, type]] = None
+        # Encoder for canonical encoding, made on first use, see `_encode_canonical`.
+        self.canonical_encoder: Optional[F] = None
+
+        if options.keep:
+            self.encoder = self.decoder = _keep
+        elif options.as_array and _get_numeric_array_shape(cls, t) is not None:
+            kind = options.as_array
+            self.encoder = options.encoder or _encode_numeric_array
+            self.decoder = options.decoder or _resolve(
+                lambda t: _get_numeric_array_decoder(cls, t, kind), t
+            )
+            if self.omitempty == _OMITEMPTY_FALSY:
+                # `not x` is ambiguous for numpy arrays.
+                self.omitempty = _OMITEMPTY_TESTER
+                self.omitempty_tester = _is_empty_array
+        else:
+            self.encoder = options.encoder or _resolve(cls.get_encoder, t)
+            self.decoder = options.decoder or _resolve(cls.get_decoder, t)
+            origin = _get_hint_origin(cls, t)
+            if options.sort_set and not options.encoder and origin in {set, frozenset}:
+                self.encoder = _get_sorted_encoder(self.encoder)
+            if options.decimal_places is not None and origin is Decimal:
+                q = _get_decimal_quantizer(options.decimal_places)
+                if not options.encoder:
+                    self.encoder = _get_quantized_encoder(self.encoder, q)
+                if not options.decoder:
+                    self.decoder = _get_quantized_decoder(self.decoder, q)
+            if not (options.encoder or options.decoder):
+                self.nested = _get_nested_shape(cls, t)
+
+
+# Modes of testing empty values for option omitempty, inlined in the conversions.
+_OMITEMPTY_FALSY = 1  # `not x`, the default.
+_OMITEMPTY_NONE = 2  # `x is None`, for types whose values are always true.
+_OMITEMPTY_TESTER = 3  # Calls the omitempty_tester option.
+
+# Types whose values are always true.
+_ALWAYS_TRUE_TYPES = {datetime, date}
+
+
+# Errors of evaluating type hints not resolvable yet, e.g. forward references to
+# the classes not defined yet.
+_EVAL_HINT_ERRORS = (NameError, TypeError)
+
+
+def _eval_optional_hint(cls, t: TypingHint) -> Optional[Tuple[TypingHint, bool]]:
+    """Evaluates type hint `t` of a field of class `cls`, and unwraps `Optional[E]`
+    to `E`. Returns the pair of the evaluated hint and whether it's optional, or
+    None if it can't be evaluated, whose errors are deferred to the field's
+    codecs, see `_resolve`.
+    """
+    try:
+        t = _eval_forward_ref(cls, t)
+        if _get_hint_kind(t) == _KIND_OPTIONAL:
+            return _eval_forward_ref(cls, _get_generics_args(t)[0]), True
+    except _EVAL_HINT_ERRORS:
+        return None
+    return t, False
 
-        # Sets default value.
-        if cls.__default_factory__ is not None:
-            for name, f in cls.__dataclass_fields__.items():
-                if f.default is MISSING and f.default_factory is MISSING:
-                    # No default value and default_factory set.
-                    t = cls._get_typing_hint_by_field(f)
-                    if _is_class_var(t):
-                        # ClassVar should be skipped.
+
+def _get_omitempty_mode(cls, t: TypingHint) -> int:
+    """Returns the mode to test whether a value of type `t` is empty, equivalent
+    to the default `not x` for values of this type.
+    This is only for encoding, on decoding the values to test are jsonable values,
+    e.g. an empty dictionary for a nested dataclass, so the default is used.
+    """
+    hint = _eval_optional_hint(cls, t)
+    if hint is None:
+        return _OMITEMPTY_FALSY
+    t = hint[0]
+
+    if t in _ALWAYS_TRUE_TYPES:
+        return _OMITEMPTY_NONE
+    if (
+        isinstance(t, type)
+        and issubclass(t, JSONAble)
+        and not hasattr(t, "__bool__")
+        and not hasattr(t, "__len__")
+    ):
+        return _OMITEMPTY_NONE
+    return _OMITEMPTY_FALSY
+
+
+def _get_hint_origin(cls, t: TypingHint) -> TypingHint:
+    """Returns the type of type hint `t` with `Optional` unwrapped, or the origin of
+    generics, e.g. `set` for `Optional[Set[int]]`. Returns None if `t` can't be
+    evaluated.
+    """
+    hint = _eval_optional_hint(cls, t)
+    if hint is None:
+        return None
+    t = hint[0]
+    if _is_generics(t):
+        return _get_generics_origin(t)
+    return t
+
+
+def _get_sorted_encoder(f: F) -> F:
+    """Returns an encoder that sorts the list encoded by `f`, for option sort_set."""
+
+    def encode(x):
+        v = f(x)
+        if type(v) is list:
+            v.sort()
+        return v
+
+    return encode
+
+
+# Quantizers of option decimal_places, by the number of places.
+_decimal_quantizers: Dict[int, F] = {}
+
+# Context to quantize decimals, whose precision is large enough for any places.
+_decimal_context = decimal.Context(
+    prec=decimal.MAX_PREC, rounding=decimal.ROUND_HALF_EVEN
+)
+
+
+def _get_decimal_quantizer(places: int) -> F:
+    """Returns the function to quantize a Decimal to given number of decimal places,
+    for option decimal_places. The quantizers are cached by places.
+    """
+    q = _decimal_quantizers.get(places)
+    if q is None:
+        exp = Decimal(1).scaleb(-places)
+        quantize = _decimal_context.quantize
+        q = _decimal_quantizers.setdefault(places, lambda x: quantize(x, exp))
+    return q
+
+
+def _get_quantized_encoder(f: F, q: F) -> F:
+    """Returns an encoder that quantizes the value by `q` before encoding by `f`."""
+    return lambda x: f(x if x is None else q(x))
+
+
+def _get_quantized_decoder(f: F, q: F) -> F:
+    """Returns a decoder that quantizes the value decoded by `f` by `q`."""
+
+    def decode(x):
+        v = f(x)
+        return v if v is None else q(v)
+
+    return decode
+
+
+def _resolve(get: Callable[[TypingHint], F], t: TypingHint) -> F:
+    """Returns the function `get(t)`. If that raises, returns a function raising the
+    same error, so that the error is deferred to the first call, as a field may be
+    never encoded or decoded, e.g. a field with only a custom decoder.
+    """
+    try:
+        return get(t)
+    except (NotImplementedError, NameError, TypeError, ValueError, AttributeError) as e:
+        err = e
+
+        def f(_):
+            raise err
+
+        return f
+
+
+def _get_numeric_array_shape(cls, t: TypingHint) -> Optional[Tuple[type, bool]]:
+    """Returns the element type of numeric list (or tuple) type hint `t`, for option
+    `as_array`, and whether it's optional. Returns None for other types, on which
+    the option is ignored.
+    """
+    hint = _eval_optional_hint(cls, t)
+    if hint is None:
+        return None
+    t, optional = hint
+
+    kind = _get_hint_kind(t)
+    if kind != _KIND_LIST_OF and kind != _KIND_TUPLE_OF:
+        return None
+    e = _get_generics_args(t)[0]
+    if e not in _ARRAY_TYPECODES:
+        return None
+    return e, optional
+
+
+def _get_numeric_array_decoder(cls, t: TypingHint, kind: str) -> F:
+    """Returns a decoder function for option `as_array`, which decodes a list of
+    numbers to an array in one call.
+    """
+    if kind not in ("numpy", "array"):
+        raise ValueError(f"invalid as_array option {kind!r}")
+
+    shape = _get_numeric_array_shape(cls, t)
+    if shape is None:
+        raise NotImplementedError(f"as_array not support type {t}")
+    e, optional = shape
+
+    f: F
+    if kind == "numpy" and _import_numpy() is not None:
+        numpy = _import_numpy()
+        dtype = numpy.int64 if e is int else numpy.float64
+        f = lambda x: numpy.asarray(x, dtype=dtype)  # noqa
+    else:
+        typecode = _ARRAY_TYPECODES[e]
+        f = lambda x: array(typecode, x)  # noqa
+
+    if optional:
+        return lambda x: None if x is None else f(x)
+    return f
+
+
+def _encode_numeric_array(x):
+    if x is None:
+        return None
+    # ndarray and array.array both have method `tolist`, which gives python numbers.
+    tolist = getattr(x, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    return list(x)
+
+
+def _is_empty_array(x) -> bool:
+    """Tests empty values for option omitempty on arrays of option `as_array`."""
+    return x is None or len(x) == 0
+
+
+def _import_numpy():
+    """Returns the numpy module, or None if it's not installed."""
+    try:
+        import numpy  # type: ignore
+    except ImportError:
+        return None
+    return numpy
+
+
+# Containers of nested JSONAble values, walked by the iterative engine.
+_NESTED_ONE = 0  # X
+_NESTED_LIST = 1  # List[X]
+_NESTED_TUPLE = 2  # Tuple[X, ...]
+_NESTED_DICT = 3  # Dict[str, X]
+
+
+def _get_nested_shape(cls, t: TypingHint) -> Optional[Tuple[int, bool, type]]:
+    """Returns the shape `(container, optional, X)` of a field typed `t` that holds
+    nested `JSONAble` values of class X, or None if it's not of such a type.
+    """
+    hint = _eval_optional_hint(cls, t)
+    if hint is None:
+        return None
+    t, optional = hint
+
+    container = _NESTED_ONE
+    if _is_generics(t):
+        ot = _get_generics_origin(t)
+        args = _get_generics_args(t)
+        if ot is list and len(args) == 1:
+            container, t = _NESTED_LIST, args[0]
+        elif ot is tuple and len(args) == 2 and args[1] is Ellipsis:
+            container, t = _NESTED_TUPLE, args[0]
+        elif ot is dict and len(args) == 2 and args[0] in (str, "str"):
+            container, t = _NESTED_DICT, args[1]
+        else:
+            # Including unions other than Optional.
+            return None
+        try:
+            t = _eval_forward_ref(cls, t)
+        except _EVAL_HINT_ERRORS:
+            return None
+
+    if isinstance(t, type) and issubclass(t, JSONAble) and _is_plan_walkable(t):
+        return container, optional, t
+    return None
+
+
+def _is_plan_walkable(t: Type[JSONAble]) -> bool:
+    """Returns whether the instances of `JSONAble` class `t` are converted by its
+    field plans, i.e. its `json`, `_json` and `from_json` aren't overridden, so
+    that they can be walked by the plans without calling these methods.
+    """
+    walkable = t.__dict__.get("__dataclass_jsonable_walkable__")
+    if walkable is None:
+        walkable = all(_is_codec_default(t, a) for a in ("json", "_json", "from_json"))
+        setattr(t, "__dataclass_jsonable_walkable__", walkable)
+    return walkable
+
+
+def _get_plan_keys(cls: Type[JSONAble]) -> FrozenSet[str]:
+    """Returns the keys that the fields of `JSONAble` class `cls` may be encoded to,
+    see `JSONAble.json_into`.
+    """
+    keys = cls.__dict__.get("__dataclass_jsonable_keys__")
+    if keys is None:
+        keys = frozenset(
+            k for p in cls._get_plan() if not p.skip for k in (p.key, *p.keys)
+        )
+        setattr(cls, "__dataclass_jsonable_keys__", keys)
+    return keys
+
+
+def _encode_iterative(obj: JSONAble, memo: bool = False, refs: bool = False) -> JSON:
+    """Encodes `obj` like `obj.json()`, but walks the nested JSONAble values with an
+    explicit stack rather than recursive calls.
+    Each nested value is encoded onto an empty dictionary, which is put into its
+    parent's dictionary before it's filled.
+
+    :param memo: encodes each nested value shared by multiple fields only once, and
+       reuses the encoded dictionary. Raises `ValueError` on cycles, including the
+       ones through the values encoded recursively, which are detected by exceeding
+       the recursion limit.
+    :param refs: like `memo`, but emits `{"$ref": "#/path/to/first/occurrence"}` for
+       the reused occurrences instead.
+    """
+    root: JSON = {}
+
+    # Chain of (id, parent chain, JSON pointer segment) of the objects from the root
+    # to a nested value, to detect cycles and make paths. Only used with memo.
+    chain: V = None
+    # Maps id of objects to (encoded dictionary, chain).
+    memos: Optional[Dict[int, Tuple[JSON, V]]] = None
+    if memo or refs:
+        chain = (id(obj), None, "")
+        memos = {id(obj): (root, chain)}
+
+    stack: List[Tuple[JSONAble, JSON, V]] = [(obj, root, chain)]
+
+    # Key of the field being encoded, to locate errors.
+    k = ""
+    try:
+        while stack:
+            o, d, chain = stack.pop()
+            choice_map = getattr(o, "__name_choice_map", None)
+            for p in o._get_plan():
+                if p.skip:
+                    continue
+
+                v = getattr(o, p.name)
+                if v is MISSING:
+                    # Not decoded, out of the projection, see `Projection`.
+                    continue
+
+                omitempty = p.omitempty
+                if omitempty:
+                    if omitempty == _OMITEMPTY_NONE:
+                        if v is None:
+                            continue
+                    elif omitempty == _OMITEMPTY_FALSY:
+                        if not v:
+                            continue
+                    elif p.omitempty_tester(v):
                         continue
-                    kwds.setdefault(name, cls.__default_factory__(t))
 
-        inst = cls(**kwds)
-        setattr(inst, "__dataclass_origin_json__", d)
-        setattr(inst, "__name_choice_map", _name_choice_map)
-        return inst  # type: ignore
+                k = p.key
+                if choice_map and p.key_choosable and p.name in choice_map:
+                    k = choice_map[p.name]
 
+                if p.nested is None or v is None:
+                    d[k] = p.encoder(v)
+                    continue
 
-J = JSONAble  # short alias
+                container = p.nested[0]
+                if container == _NESTED_ONE:
+                    es = [v]
+                elif container == _NESTED_DICT:
+                    es = list(v.values())
+                    names = list(map(str, v))
+                else:
+                    es = v
+
+                # Encoded dictionaries to fill in.
+                cs: List[V] = []
+                for i, e in enumerate(es):
+                    if (
+                        not isinstance(e, JSONAble)
+                        or e.__json_cache__ is not None
+                        or not _is_plan_walkable(type(e))
+                    ):
+                        # None, or values to encode on their own.
+                        cs.append(None if e is None else _encode_jsonable(e))
+                        continue
+
+                    c: JSON = {}
+                    if memos is None:
+                        stack.append((e, c, None))
+                        cs.append(c)
+                        continue
+
+                    if container == _NESTED_ONE:
+                        segment = _escape_json_pointer(k)
+                    elif container == _NESTED_DICT:
+                        segment = f"{_escape_json_pointer(k)}/{_escape_json_pointer(names[i])}"
+                    else:
+                        segment = f"{_escape_json_pointer(k)}/{i}"
+                    node = (id(e), chain, segment)
+
+                    m = memos.get(id(e))
+                    if m is None:
+                        memos[id(e)] = (c, node)
+                        stack.append((e, c, node))
+                        cs.append(c)
+                        continue
+
+                    # Encoded before, or is an ancestor.
+                    x = chain
+                    while x is not None:
+                        if x[0] == id(e):
+                            path = _get_json_pointer(node)
+                            raise ValueError(f"cycle detected at {path}")
+                        x = x[1]
+                    cs.append({"$ref": _get_json_pointer(m[1])} if refs else m[0])
+
+                if container == _NESTED_ONE:
+                    d[k] = cs[0]
+                elif container == _NESTED_DICT:
+                    d[k] = dict(zip(names, cs))
+                else:
+                    d[k] = cs
+    except RecursionError as e:
+        if memos is None:
+            raise
+        # Values encoded by recursive calls, e.g. of Any, unions, plain records or
+        # custom encoders, aren't walked here, cycles through them end up in
+        # exceeding the recursion limit.
+        path = _get_json_pointer((id(o), chain, _escape_json_pointer(k)))
+        raise ValueError(f"cycle detected, or nested too deep, at {path}") from e
+    return root
+
+
+def _escape_json_pointer(s: str) -> str:
+    return s.replace("~", "~0").replace("/", "~1")
+
+
+def _get_json_pointer(chain) -> str:
+    """Returns the JSON pointer (RFC 6901) of the object at the end of `chain`."""
+    segments = []
+    while chain is not None:
+        if chain[2]:
+            segments.append(chain[2])
+        chain = chain[1]
+    return "/".join(["#"] + segments[::-1])
+
+
+def _decode_iterative(cls: Type[T], d: JSON) -> T:
+    """Decodes `d` like `cls.from_json(d)`, but walks the nested JSONAble values
+    with an explicit stack rather than recursive calls.
+    Dictionaries are visited in pre-order, a nested value's slot in its parent's
+    arguments is left None. Then instances are constructed in the reversed order, so
+    that children are always constructed before their parents and fill the slots.
+    """
+    result: List[V] = [None]
+    # Items of (class, dictionary, slot container, slot key).
+    stack: List[Tuple[type, JSON, V, V]] = [(cls, d, result, 0)]
+    # Items of (class, dictionary, kwds, choice map, tuple fields, slot container,
+    # slot key).
+    nodes = []
+
+    # The dictionary and field being decoded, to locate errors.
+    x: JSON = d
+    p = None
+    choice_map: JSON = {}
+    try:
+        while stack:
+            c, x, container, key = stack.pop()
+            kwds: Dict[str, V] = {}
+            choice_map = {}
+            tuples = []
+
+            for p in c._get_plan():  # type: ignore
+                if p.skip:
+                    continue
+
+                for k in p.keys:
+                    if k in x:
+                        choice_map[p.name] = k
+                        v = x[k]
+                        break
+                else:
+                    if p.default_before_decoding is None:
+                        continue
+                    v = p.default_before_decoding
+
+                if p.omitempty:
+                    if p.omitempty == _OMITEMPTY_TESTER:
+                        if p.omitempty_tester(v):
+                            continue
+                    elif not v:
+                        continue
+                if p.before_decoder:
+                    v = p.before_decoder(v)
 
+                if p.nested is None or (v is None and p.nested[1]):
+                    kwds[p.name] = p.decoder(v)
+                    continue
+
+                shape, _, t = p.nested
+                if shape == _NESTED_ONE:
+                    kwds[p.name] = None
+                    stack.append((t, v, kwds, p.name))
+                elif shape == _NESTED_DICT:
+                    dv: Dict[str, V] = dict.fromkeys(v)
+                    kwds[p.name] = dv
+                    stack.extend((t, e, dv, k) for k, e in v.items())
+                else:
+                    lv: List[V] = [None] * len(v)
+                    kwds[p.name] = lv
+                    stack.extend((t, e, lv, i) for i, e in enumerate(v))
+                    if shape == _NESTED_TUPLE:
+                        tuples.append(p.name)
+
+            p = None
+            nodes.append((c, x, kwds, choice_map, tuples, container, key))
+
+        for c, x, kwds, choice_map, tuples, container, key in reversed(nodes):
+            for name in tuples:
+                kwds[name] = tuple(kwds[name])
+            container[key] = c._construct(x, kwds, choice_map)  # type: ignore
+        return result[0]
+    except DecodeError as e:
+        e.root = d
+        raise
+    except NotImplementedError:
+        raise
+    except Exception as e:
+        key = None if p is None else choice_map.get(p.name, p.key)
+        err = _make_decode_error(e, x, key)
+        err.root = d
+        raise err from e
+
+
+# Typecodes of array.array for numeric types.
+_ARRAY_TYPECODES = {int: "q", float: "d"}
 
 # Makes some encoder/decoder function be static.
 
@@ -596,14 +2419,522 @@ _encode_date = lambda x: x.strftime("%Y-%m-%d")  # noqa
 _encode_timedelta = lambda x: int(x.total_seconds())  # noqa
 _encode_enum = lambda x: x.value  # noqa
 _encode_None = lambda _: None  # noqa
-_encode_jsonable = lambda x: x.json()  # noqa
 _decode_datetime = lambda x: datetime.fromtimestamp(int(x))  # noqa
 _decode_date = lambda x: datetime.strptime(x, "%Y-%m-%d").date()  # noqa
 _decode_timedelta = lambda x: timedelta(seconds=int(x))  # noqa
 _decode_None = lambda _: None  # noqa
-_decode_decimal = lambda x: Decimal(str(x))  # noqa
+_keep = lambda x: x  # noqa
+
+
+def _decode_decimal(x):
+    if type(x) is float:
+        # Decimal(x) would be the exact binary value, e.g. 0.1000000000000000055...
+        # The repr is the shortest string that round-trips, e.g. "0.1".
+        return Decimal(repr(x))
+    # Strings and integers are converted directly.
+    return Decimal(x)
+
+
+class _ReadOnlyDict(dict):
+    """Read-only dictionary, cached by `__json_cache__` mode "readonly". Being a
+    dict, it can be serialized by `json.dumps`, unlike a `MappingProxyType`.
+    """
+
+    def _readonly(self, *args, **kwds):
+        raise TypeError("the cached json dictionary is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore
 
-_default_omitempty_tester = lambda x: not x  # noqa
+    def __reduce__(self):
+        return _ReadOnlyDict, (dict(self),)
+
+
+# Available values of class-level option `__json_cache__`.
+_JSON_CACHE_MODES = {"copy", "readonly", "shared"}
+
+# Modes of `__json_cache__` whose `json()` returns the cached dictionary itself.
+_SHARED_JSON_CACHE_MODES = {"readonly", "shared"}
+
+
+def _encode_jsonable(x) -> JSON:
+    """Encodes nested value `x` by its `json()`. A dictionary shared by the
+    encoded-output cache of `x` is copied, as the encoded parent is not, and its
+    callers are free to mutate it.
+    """
+    d = x.json()
+    if getattr(x, "__json_cache__", None) in _SHARED_JSON_CACHE_MODES:
+        return _copy_json(d)
+    return d
+
+
+def _get_union_members(cls, args) -> Tuple[List[TypingHint], bool]:
+    """Returns the members of union with arguments `args` except `None`, and whether
+    `None` is a member.
+    """
+    members = [_eval_forward_ref(cls, a) for a in args if a is not type(None)]
+    return members, len(members) != len(args)
+
+
+def _get_union_tags(members: List[TypingHint]) -> Optional[Tuple[str, Dict[str, type]]]:
+    """Returns the tag key and the mapping from tags to classes, if the union of
+    `members` is tagged, or None if it's untagged.
+    """
+    tagged = [
+        isinstance(m, type) and issubclass(m, JSONAble) and m.__json_tag__ is not None
+        for m in members
+    ]
+    if not any(tagged):
+        return None
+    if not all(tagged):
+        raise NotImplementedError(f"union of tagged and untagged members {members}")
+
+    keys = {m.__json_tag_key__ for m in members}
+    if len(keys) != 1:
+        raise NotImplementedError(f"union members use different tag keys {keys}")
+    key = keys.pop()
+    tags: Dict[str, type] = {}
+    for m in members:
+        if m.__json_tag__ in tags:
+            raise ValueError(f"duplicate tag {m.__json_tag__!r} in union {members}")
+        tags[m.__json_tag__] = m
+        # The fields' own keys would overwrite the tag.
+        for f in dataclasses.fields(m):
+            options = m._get_json_options(f)
+            if options.skip:
+                continue
+            for action in (Action.ENCODING, Action.DECODING):
+                if key in _util_get_field_keys(f.name, options, action):
+                    raise ValueError(
+                        f"field {f.name!r} of {m.__name__} conflicts with "
+                        f"tag key {key!r}, set another __json_tag_key__"
+                    )
+    return key, tags
+
+
+def _get_union_encoder(cls, args) -> F:
+    """Returns the encoder for a field of union with arguments `args`, which
+    dispatches on the value's class.
+    """
+    members, optional = _get_union_members(cls, args)
+    union = _get_union_tags(members)
+
+    # Maps the value's class to the encoder. The first member wins if multiple members
+    # have the same class, e.g. List[int] and List[str].
+    encoders: Dict[type, F] = {}
+    if union is not None:
+        key, tags = union
+        for tag, m in tags.items():
+            encoders[m] = _get_tagged_encoder(m, cls.get_encoder(m), key, tag)
+    else:
+        for m in members:
+            c = _get_generics_origin(m) if _is_generics(m) else m
+            if isinstance(c, type) and c not in encoders:
+                encoders[c] = _resolve(cls.get_encoder, m)
+    if optional:
+        encoders[type(None)] = _encode_None
+
+    def encode(x):
+        f = encoders.get(type(x))
+        if f is None:
+            # Subclasses of members.
+            for c, g in encoders.items():
+                if isinstance(x, c):
+                    f = g
+                    break
+            else:
+                raise TypeError(f"value {x!r} is not a member of union {members}")
+        return f(x)
+
+    return encode
+
+
+def _get_tagged_encoder(m: Type[JSONAble], f: F, key: str, tag: str) -> F:
+    """Returns an encoder of tagged union member `m` that puts the `tag` into the
+    dictionary encoded by `f`.
+    """
+    if (
+        f is _encode_jsonable
+        and m.__json_cache__ is None
+        and not m.__json_iterative__
+        and _is_plan_walkable(m)
+    ):
+        # Encodes into the dictionary holding the tag, rather than copying.
+        return lambda x: (
+            x._json(None, {key: tag}) if type(x) is m else {key: tag, **f(x)}
+        )
+    return lambda x: {key: tag, **f(x)}
+
+
+# Types of JSON values that members of untagged unions of these types accept.
+_UNION_SCALAR_TYPES = {
+    bool: (bool,),
+    int: (int,),
+    float: (int, float),
+    str: (str,),
+}
+
+
+def _get_union_decoder(cls, args) -> F:
+    """Returns the decoder for a field of union with arguments `args`."""
+    members, optional = _get_union_members(cls, args)
+    union = _get_union_tags(members)
+
+    if union is not None:
+        key, tags = union
+        decoders = {tag: cls.get_decoder(m) for tag, m in tags.items()}
+
+        def decode_tagged(x):
+            if x is None and optional:
+                return None
+            f = decoders.get(x.get(key))
+            if f is None:
+                raise ValueError(f"unknown tag {x.get(key)!r} of key {key!r}")
+            return f(x)
+
+        return decode_tagged
+
+    # List of (accepted JSON types or None for any, decoder) of members.
+    tries: List[Tuple[Optional[Tuple[type, ...]], F]] = []
+    for m in members:
+        if _is_jsonable_like(m):
+            tries.append(((dict,), _resolve(cls.get_decoder, m)))
+        else:
+            tries.append((_UNION_SCALAR_TYPES.get(m), _resolve(cls.get_decoder, m)))
+
+    # Maps the shape of values to the index of the member decoded the last value of
+    # this shape. Bounded, as key sets of dictionaries may be unlimited.
+    last: Dict[V, int] = {}
+
+    def decode_untagged(x):
+        if x is None and optional:
+            return None
+        shape = frozenset(x) if type(x) is dict else type(x)
+        i = last.get(shape)
+        if i is not None:
+            try:
+                return tries[i][1](x)
+            except _DECODE_VALUE_ERRORS:
+                pass
+        for j, (types, f) in enumerate(tries):
+            if j == i or (types is not None and type(x) not in types):
+                continue
+            try:
+                v = f(x)
+            except _DECODE_VALUE_ERRORS:
+                continue
+            if shape in last or len(last) < _UNION_SHAPES_MAX_SIZE:
+                last[shape] = j
+            return v
+        raise ValueError(f"no member of union {members} can decode {x!r}")
+
+    return decode_untagged
+
+
+# Max number of shapes to remember per untagged union field.
+_UNION_SHAPES_MAX_SIZE = 64
+
+
+# Header of the binary form, followed by the schema fingerprint.
+_BINARY_MAGIC = b"DJ\x01"
+
+# Type tags of values in the binary form.
+_BINARY_NONE = 0
+_BINARY_FALSE = 1
+_BINARY_TRUE = 2
+_BINARY_INT = 3  # Zigzag varint.
+_BINARY_FLOAT = 4  # 8 bytes double.
+_BINARY_STR = 5  # Varint length, then the UTF-8 bytes.
+_BINARY_LIST = 6  # Varint length, then the elements.
+_BINARY_DICT = 7  # Varint length, then the pairs of key (without tag) and value.
+_BINARY_OBJECT = 8  # The values of the fields of a nested JSONAble, by position.
+_BINARY_ABSENT = 9  # The field is absent, e.g. omitted by omitempty.
+
+_binary_float = struct.Struct("<d")
+
+# Types of encoded dictionaries, which may be read-only views, see `__json_cache__`.
+_BINARY_MAPPINGS = (dict, MappingProxyType)
+
+
+def _get_binary_fingerprint(cls) -> bytes:
+    """Returns the fingerprint of the binary layout of dataclass `cls`, made of the
+    keys and types of its fields, and of its nested classes, recursively.
+    It's cached on the class as attribute `__dataclass_jsonable_binary__`.
+    """
+    fingerprint = cls.__dict__.get("__dataclass_jsonable_binary__")
+    if fingerprint is None:
+        parts = []
+        seen = set()
+        classes = [cls]
+        while classes:
+            c = classes.pop()
+            if c in seen:
+                continue
+            seen.add(c)
+            parts.append(f"{c.__module__}.{c.__qualname__}")
+            for p in c._get_plan():
+                if not p.skip:
+                    parts.append(f"{p.key}:{_get_stable_repr(p.t)}")
+                    if p.nested is not None:
+                        classes.append(p.nested[2])
+        fingerprint = hashlib.sha1("\n".join(parts).encode()).digest()[:8]
+        setattr(cls, "__dataclass_jsonable_binary__", fingerprint)
+    return fingerprint
+
+
+def _binary_write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _binary_write_str(out: bytearray, s: str) -> None:
+    b = s.encode()
+    n = len(b)
+    if n < 0x80:
+        out.append(n)
+    else:
+        _binary_write_varint(out, n)
+    out += b
+
+
+def _binary_write(out: bytearray, v: V) -> None:
+    """Writes a jsonable value `v` with its type tag."""
+    t = type(v)
+    if t is str:
+        # Fast path for the most common type.
+        out.append(_BINARY_STR)
+        _binary_write_str(out, v)
+    elif v is None:
+        out.append(_BINARY_NONE)
+    elif v is True:
+        out.append(_BINARY_TRUE)
+    elif v is False:
+        out.append(_BINARY_FALSE)
+    elif isinstance(v, int):
+        out.append(_BINARY_INT)
+        _binary_write_varint(out, v << 1 if v >= 0 else (-v << 1) - 1)
+    elif isinstance(v, float):
+        out.append(_BINARY_FLOAT)
+        out += _binary_float.pack(v)
+    elif isinstance(v, str):
+        out.append(_BINARY_STR)
+        _binary_write_str(out, v)
+    elif isinstance(v, (list, tuple, set)):
+        out.append(_BINARY_LIST)
+        _binary_write_varint(out, len(v))
+        for e in v:
+            _binary_write(out, e)
+    elif isinstance(v, _BINARY_MAPPINGS):
+        out.append(_BINARY_DICT)
+        _binary_write_varint(out, len(v))
+        for k, e in v.items():
+            _binary_write_str(out, k)
+            _binary_write(out, e)
+    else:
+        raise TypeError(f"value of type {type(v)} is not jsonable")
+
+
+def _binary_write_object(out: bytearray, d: Mapping[str, V], cls) -> None:
+    """Writes the values of dictionary `d` encoded from an instance of dataclass
+    `cls` (without the type tag), by the order of its fields.
+    """
+    for p in cls._get_plan():
+        if p.skip:
+            continue
+        for k in p.keys:
+            if k in d:
+                v = d[k]
+                break
+        else:
+            out.append(_BINARY_ABSENT)
+            continue
+
+        nested = p.nested
+        if nested is None or v is None:
+            _binary_write(out, v)
+            continue
+        container, _, c = nested
+        if container == _NESTED_ONE and isinstance(v, _BINARY_MAPPINGS):
+            out.append(_BINARY_OBJECT)
+            _binary_write_object(out, v, c)
+        elif container == _NESTED_DICT and isinstance(v, _BINARY_MAPPINGS):
+            out.append(_BINARY_DICT)
+            _binary_write_varint(out, len(v))
+            for k, e in v.items():
+                _binary_write_str(out, k)
+                if isinstance(e, _BINARY_MAPPINGS):
+                    out.append(_BINARY_OBJECT)
+                    _binary_write_object(out, e, c)
+                else:
+                    _binary_write(out, e)
+        elif container != _NESTED_ONE and isinstance(v, list):
+            out.append(_BINARY_LIST)
+            _binary_write_varint(out, len(v))
+            for e in v:
+                if isinstance(e, _BINARY_MAPPINGS):
+                    out.append(_BINARY_OBJECT)
+                    _binary_write_object(out, e, c)
+                else:
+                    _binary_write(out, e)
+        else:
+            _binary_write(out, v)
+
+
+def _binary_read_varint(b: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        x = b[pos]
+        pos += 1
+        n |= (x & 0x7F) << shift
+        if x < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _binary_read_str(b: bytes, pos: int) -> Tuple[str, int]:
+    n = b[pos]
+    if n < 0x80:
+        pos += 1
+    else:
+        n, pos = _binary_read_varint(b, pos)
+    end = pos + n
+    return b[pos:end].decode(), end
+
+
+def _binary_read(b: bytes, pos: int, cls) -> Tuple[V, int]:
+    """Reads a value with its type tag at position `pos` of `b`, returns the value
+    and the position after it. The nested objects are read as dataclass `cls`.
+    """
+    tag = b[pos]
+    pos += 1
+    if tag == _BINARY_STR:
+        return _binary_read_str(b, pos)
+    if tag == _BINARY_INT:
+        n, pos = _binary_read_varint(b, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _BINARY_OBJECT and cls is not None:
+        # Objects are only written for the fields holding nested values.
+        return _binary_read_object(b, pos, cls)
+    if tag == _BINARY_NONE:
+        return None, pos
+    if tag == _BINARY_TRUE:
+        return True, pos
+    if tag == _BINARY_FALSE:
+        return False, pos
+    if tag == _BINARY_FLOAT:
+        return _binary_float.unpack_from(b, pos)[0], pos + 8
+    if tag == _BINARY_LIST:
+        n, pos = _binary_read_varint(b, pos)
+        a = []
+        for _ in range(n):
+            e, pos = _binary_read(b, pos, cls)
+            a.append(e)
+        return a, pos
+    if tag == _BINARY_DICT:
+        n, pos = _binary_read_varint(b, pos)
+        d = {}
+        for _ in range(n):
+            k, pos = _binary_read_str(b, pos)
+            d[k], pos = _binary_read(b, pos, cls)
+        return d, pos
+    raise ValueError(f"invalid type tag {tag} in binary data at {pos - 1}")
+
+
+def _binary_read_object(b: bytes, pos: int, cls) -> Tuple[JSON, int]:
+    """Reads the values of the fields of dataclass `cls` at position `pos` of `b`,
+    written by `_binary_write_object`, to a jsonable dictionary.
+    """
+    d = {}
+    for p in cls._get_plan():
+        if p.skip:
+            continue
+        if b[pos] == _BINARY_ABSENT:
+            pos += 1
+            continue
+        nested = p.nested
+        d[p.key], pos = _binary_read(b, pos, None if nested is None else nested[2])
+    return d, pos
+
+
+def _json_list_into(values: V, target: List[V]) -> None:
+    """Encodes the nested `JSONAble` values (or None) into list `target` in place,
+    the dictionaries in it are reused by `json_into`.
+    """
+    n = len(target)
+    for i, e in enumerate(values):
+        if i < n:
+            old = target[i]
+            if e is not None and type(old) is dict and _is_plan_walkable(type(e)):
+                e.json_into(old)
+            else:
+                target[i] = None if e is None else _encode_jsonable(e)
+        else:
+            target.append(None if e is None else _encode_jsonable(e))
+    del target[len(values) :]
+
+
+def _find_json_path(root: V, target: V) -> Optional[List[Union[str, int]]]:
+    """Returns the keys and indexes from `root` to `target` (by identity) in a
+    jsonable value, or None if `target` is not in `root`.
+    """
+    # Items of (value, path).
+    stack: List[Tuple[V, List[Union[str, int]]]] = [(root, [])]
+    while stack:
+        x, path = stack.pop()
+        if x is target:
+            return path
+        if isinstance(x, dict):
+            stack.extend((v, path + [k]) for k, v in x.items())
+        elif isinstance(x, list):
+            stack.extend((v, path + [i]) for i, v in enumerate(x))
+    return None
+
+
+def _copy_json(x):
+    """Copies a jsonable value, the nested dicts and lists are copied as well.
+    Dict subclasses, e.g. the read-only cached ones, are copied to plain dicts.
+    """
+    if isinstance(x, dict):
+        return {k: _copy_json(v) for k, v in x.items()}
+    if type(x) is list:
+        return [_copy_json(e) for e in x]
+    return x
+
+
+def _get_dict_key_encoder(t: TypingHint) -> F:
+    """Returns the function to encode the keys of a dictionary typed `Dict[t, E]`
+    to strings, the keys of JSON objects.
+    Raises `NotImplementedError` if given key type is not supported.
+    """
+    if t is str or t is int or t is Decimal:
+        return str
+    if t is date:
+        return _encode_date
+    if isinstance(t, type) and issubclass(t, Enum):
+        return lambda k: str(k.value)
+    raise NotImplementedError(f"dict with keys of type {t} is not supported")
+
+
+def _get_dict_key_decoder(t: TypingHint) -> F:
+    """Returns the function to decode the string keys of a JSON object to keys of a
+    dictionary typed `Dict[t, E]`.
+    Raises `NotImplementedError` if given key type is not supported.
+    """
+    if t is str:
+        return str
+    if t is int:
+        return int
+    if t is Decimal:
+        return Decimal
+    if t is date:
+        return _decode_date
+    if isinstance(t, type) and issubclass(t, Enum):
+        # Looks up the members by their encoded values.
+        members = {str(m.value): m for m in t}
+        return lambda k: members[k] if k in members else t(k)
+    raise NotImplementedError(f"dict with keys of type {t} is not supported")
 
 
 def _encode_dict(x):
@@ -620,6 +2951,353 @@ def _decode_dict(x):
     return {k: JSONAble.get_decoder(type(v))(v) for k, v in x.items()}
 
 
+def _encode_canonical(
+    x: V, owner: Type[JSONAble], plan: Optional[List["_FieldPlan"]] = None
+) -> JSON:
+    """Encodes `x` to the canonical form by the field plans of class `owner`, see
+    `JSONAble.json`. `x` is an instance of `owner`, or of the record it adapts, see
+    `_get_record_adapter`. Encodes only the fields in given `plan` if provided.
+    """
+    if plan is None:
+        plan = owner.__dict__.get("__dataclass_jsonable_canonical__")
+        if plan is None:
+            # The plans sorted by keys, cached on the class.
+            plan = sorted(owner._get_plan(), key=attrgetter("key"))
+            setattr(owner, "__dataclass_jsonable_canonical__", plan)
+    else:
+        plan = sorted(plan, key=attrgetter("key"))
+
+    is_dict = isinstance(x, dict)  # TypedDict
+    d: JSON = {}
+    for p in plan:
+        if p.skip:
+            continue
+        if is_dict:
+            if p.name not in x:
+                continue
+            v = x[p.name]
+        else:
+            v = getattr(x, p.name)
+            if v is MISSING:
+                # Not decoded, out of the projection, see `Projection`.
+                continue
+
+        omitempty = p.omitempty
+        if omitempty:
+            if omitempty == _OMITEMPTY_NONE:
+                if v is None:
+                    continue
+            elif omitempty == _OMITEMPTY_FALSY:
+                if not v:
+                    continue
+            elif p.omitempty_tester(v):
+                continue
+
+        f = p.canonical_encoder
+        if f is None:
+            f = p.canonical_encoder = _get_canonical_field_encoder(owner, p)
+        d[p.key] = f(v)
+    return d
+
+
+def _get_canonical_field_encoder(cls, p: "_FieldPlan") -> F:
+    """Returns the canonical encoder of the field of plan `p` of class `cls`."""
+    options = p.options
+    if options.keep or options.encoder or p.encoder is _encode_numeric_array:
+        # Custom encoding, canonicalizes its output.
+        f = p.encoder
+        return lambda x: _canonicalize(f(x))
+    return _resolve(lambda t: _get_canonical_encoder(cls, t), p.t)
+
+
+def _get_canonical_encoder(cls, t: TypingHint) -> F:
+    """Returns the canonical encoder function for type `t`, which follows the
+    structure of `cls.get_encoder(t)`. Types whose canonical values can't be told
+    from the type are encoded by `get_encoder` and then canonicalized.
+    """
+    t = _eval_forward_ref(cls, t)
+    if t is float:
+        return _encode_canonical_float
+    elif t is Decimal:
+        return _encode_canonical_decimal
+    elif t is Any:
+        # Any runs reflection encoding.
+        return lambda x: _get_canonical_encoder(cls, type(x))(x)
+    elif t is list or t is tuple:
+        return lambda x: [_get_canonical_encoder(cls, type(e))(e) for e in x]
+    elif t is set or t is frozenset:
+        return lambda x: _sort_canonical(
+            [_get_canonical_encoder(cls, type(e))(e) for e in x]
+        )
+    elif t is dict:
+        return lambda x: _encode_canonical_dict(cls, x)
+    elif t is str or t is int or t is bool or t is type(None):
+        # Canonical already.
+        return cls.get_encoder(t)
+    elif isinstance(t, type) and issubclass(t, JSONAble):
+        if "__dataclass_jsonable_origin__" in t.__dict__:
+            # Parameterized generic, encodes by its own plans.
+            return lambda x: _encode_canonical(x, t)
+        return lambda x: _encode_canonical(x, type(x))
+    elif _is_plain_record(t):
+        adapter = _get_record_adapter(t)
+        return lambda x: _encode_canonical(x, adapter)
+    elif _is_generics(t):
+        ot = _get_generics_origin(t)
+        args = _get_generics_args(t)
+        if ot is list or (ot is tuple and len(args) == 2 and args[1] is Ellipsis):
+            # List[E] / Tuple[E, ...]
+            f = _get_canonical_encoder(cls, args[0])
+            return lambda x: [f(e) for e in x]
+        if ot is tuple:
+            # Tuple[E1, E2, E3]
+            fs = [_get_canonical_encoder(cls, a) for a in args]
+            return lambda x: [fs[i](e) for i, e in enumerate(x)]
+        if ot is set or ot is frozenset:
+            # Set[E] / FrozenSet[E]
+            f = _get_canonical_encoder(cls, args[0])
+            return lambda x: _sort_canonical([f(e) for e in x])
+        if ot is dict:
+            # Dict[K, E]
+            g = _get_dict_key_encoder(_eval_forward_ref(cls, args[0]))
+            f = _get_canonical_encoder(cls, args[1])
+            return lambda x: dict(
+                sorted(((g(k), f(v)) for k, v in x.items()), key=itemgetter(0))
+            )
+        if ot is Union and len(args) == 2 and args[1] is type(None):
+            # Optional[E]
+            f = _get_canonical_encoder(cls, args[0])
+            return lambda x: None if x is None else f(x)
+
+    f = cls.get_encoder(t)
+    return lambda x: _canonicalize(f(x))
+
+
+def _encode_canonical_dict(cls, x: JSON) -> JSON:
+    """Encodes dictionary `x` of any values to the canonical form, like `_encode_dict`."""
+    for k in x:
+        if not isinstance(k, str):
+            raise NotImplementedError("dict with non-str keys is not supported")
+    return {k: _get_canonical_encoder(cls, type(x[k]))(x[k]) for k in sorted(x)}
+
+
+def _canonicalize(v: V) -> V:
+    """Returns the canonical form of jsonable value `v`, see `JSONAble.json`."""
+    if isinstance(v, _BINARY_MAPPINGS):
+        return {k: _canonicalize(v[k]) for k in sorted(v)}
+    if isinstance(v, (list, tuple)):
+        return [_canonicalize(e) for e in v]
+    if type(v) is float:
+        return _encode_canonical_float(v)
+    return v
+
+
+def _encode_canonical_float(x: float) -> Union[int, float]:
+    x = float(x)
+    if x.is_integer():
+        # 1.0 to 1, and -0.0 to 0.
+        return int(x)
+    return x
+
+
+def _encode_canonical_decimal(x: Decimal) -> str:
+    # Removes trailing zeros without rounding, which normalize() would do.
+    s = format(x, "f")
+    if "." in s:
+        s = s.rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+
+def _sort_canonical(values: List[V]) -> List[V]:
+    """Sorts the canonical values of a set, by their JSON texts if not comparable."""
+    try:
+        values.sort()
+    except TypeError:
+        values.sort(key=_canonical_dumps)
+    return values
+
+
+# Encodes a canonical value to its JSON text, see `JSONAble.content_hash`.
+_canonical_dumps = json.JSONEncoder(separators=(",", ":"), allow_nan=False).encode
+
+# Containers longer than this are fed to the hasher in chunks of this length.
+_HASH_CHUNK_ITEMS = 64
+
+
+def _hash_canonical(d: JSON) -> str:
+    """Returns the SHA-256 hex digest of the JSON text of canonical dictionary `d`."""
+    h = hashlib.sha256()
+    _feed_canonical(h.update, d, True)
+    return h.hexdigest()
+
+
+def _feed_canonical(update: Callable[[bytes], V], v: V, split: bool = False) -> None:
+    """Feeds the JSON text of canonical value `v` to function `update` in pieces:
+    small values are encoded in one call, large containers are split.
+    """
+    if type(v) is dict and (split or len(v) > _HASH_CHUNK_ITEMS):
+        update(b"{")
+        for i, (k, e) in enumerate(v.items()):
+            if i:
+                update(b",")
+            update(_canonical_dumps(k).encode())
+            update(b":")
+            _feed_canonical(update, e)
+        update(b"}")
+    elif type(v) is list and (split or len(v) > _HASH_CHUNK_ITEMS):
+        # Encodes a chunk of elements in one call, without the brackets.
+        update(b"[")
+        for i in range(0, len(v), _HASH_CHUNK_ITEMS):
+            if i:
+                update(b",")
+            update(_canonical_dumps(v[i : i + _HASH_CHUNK_ITEMS])[1:-1].encode())
+        update(b"]")
+    else:
+        update(_canonical_dumps(v).encode())
+
+
+# Kinds of type hints, which get_encoder and get_decoder dispatch on.
+_KIND_UNKNOWN = 0  # Not supported.
+_KIND_NONE = 1  # NoneType
+_KIND_SCALAR = 2  # bool, int, float, str
+_KIND_DECIMAL = 3
+_KIND_DATETIME = 4
+_KIND_DATE = 5
+_KIND_TIMEDELTA = 6
+_KIND_ENUM = 7  # Enum and IntEnum classes.
+_KIND_TYPEVAR = 8
+_KIND_ANY = 9
+_KIND_NESTED = 10  # JSONAble-like classes, see `_is_jsonable_like`.
+_KIND_RECORD = 11  # Plain records, see `_is_plain_record`.
+_KIND_LIST = 12  # list
+_KIND_SET = 13  # set, frozenset
+_KIND_DICT = 14  # dict
+_KIND_LIST_OF = 15  # List[E]
+_KIND_SET_OF = 16  # Set[E], FrozenSet[E]
+_KIND_TUPLE_OF = 17  # Tuple[E, ...]
+_KIND_TUPLE_FIXED = 18  # Tuple[E1, E2, E3]
+_KIND_DICT_OF = 19  # Dict[K, E]
+_KIND_OPTIONAL = 20  # Optional[E]
+_KIND_UNION = 21  # Other unions.
+_KIND_FORWARD_REF = 22  # Strings and ForwardRef.
+
+# Kinds of type hints, classified at the first lookup, see `_get_hint_kind`.
+_hint_kinds: Dict[TypingHint, int] = {
+    type(None): _KIND_NONE,
+    bool: _KIND_SCALAR,
+    int: _KIND_SCALAR,
+    float: _KIND_SCALAR,
+    str: _KIND_SCALAR,
+    Decimal: _KIND_DECIMAL,
+    datetime: _KIND_DATETIME,
+    date: _KIND_DATE,
+    timedelta: _KIND_TIMEDELTA,
+    Any: _KIND_ANY,
+    list: _KIND_LIST,
+    set: _KIND_SET,
+    frozenset: _KIND_SET,
+    dict: _KIND_DICT,
+}
+
+# Max number of type hints to remember the kinds of, e.g. classes made at runtime
+# shouldn't be kept alive without limit.
+_HINT_KINDS_MAX_SIZE = 4096
+
+
+def _get_hint_kind(t: TypingHint) -> int:
+    """Returns the kind of type hint `t`, from the table of the classified ones."""
+    try:
+        return _hint_kinds[t]
+    except KeyError:
+        kind = _classify_hint(t)
+        if len(_hint_kinds) < _HINT_KINDS_MAX_SIZE:
+            _hint_kinds[t] = kind
+        return kind
+    except TypeError:
+        # Unhashable.
+        return _classify_hint(t)
+
+
+def _classify_hint(t: TypingHint) -> int:
+    """Classifies type hint `t` to its kind, see `_get_hint_kind`.
+    The basic types are in the table in advance.
+    """
+    if isinstance(t, TypeVar):
+        return _KIND_TYPEVAR
+    if isinstance(t, (str, ForwardRef)):
+        return _KIND_FORWARD_REF
+    if _is_generics(t):
+        # Checked before classes, e.g. list[int] looks like a class before 3.11.
+        ot = _get_generics_origin(t)
+        args = _get_generics_args(t)
+        if ot is list:
+            return _KIND_LIST_OF
+        if ot is set or ot is frozenset:
+            return _KIND_SET_OF
+        if ot is tuple:
+            if len(args) == 2 and args[1] is Ellipsis:
+                return _KIND_TUPLE_OF
+            return _KIND_TUPLE_FIXED
+        if ot is dict:
+            return _KIND_DICT_OF
+        if ot is Union:
+            if len(args) == 2 and args[1] is type(None):
+                return _KIND_OPTIONAL
+            return _KIND_UNION
+        return _KIND_UNKNOWN
+    if isinstance(t, type):
+        if issubclass(t, Enum):
+            return _KIND_ENUM
+        if _is_jsonable_like(t):
+            return _KIND_NESTED
+        if _is_plain_record(t):
+            return _KIND_RECORD
+    return _KIND_UNKNOWN
+
+
+def _is_codec_default(cls, attr: str) -> bool:
+    """Returns whether method `attr` of class `cls`, e.g. `get_encoder`, is the
+    default one of `JSONAble`, i.e. not overridden.
+    """
+    f1, f2 = getattr(cls, attr), getattr(JSONAble, attr)
+    return getattr(f1, "__func__", f1) is getattr(f2, "__func__", f2)
+
+
+def _encode_any(x):
+    """Encodes value `x` of type Any, like `JSONAble.get_encoder(type(x))(x)`, but the
+    values of JSON types are encoded without looking up their encoders.
+    """
+    kind = _get_hint_kind(type(x))
+    if kind == _KIND_SCALAR or kind == _KIND_NONE:
+        # Encoded as they are, as bool(x), int(x) etc. would do.
+        return x
+    if kind == _KIND_LIST or kind == _KIND_SET:
+        return [_encode_any(e) for e in x]
+    if kind == _KIND_DICT:
+        for k in x:
+            if not isinstance(k, str):
+                raise NotImplementedError("dict with non-str keys is not supported")
+        return {k: _encode_any(v) for k, v in x.items()}
+    return JSONAble.get_encoder(type(x))(x)
+
+
+def _decode_any(x):
+    """Decodes value `x` of type Any, like `JSONAble.get_decoder(type(x))(x)`, but the
+    values of JSON types are decoded without looking up their decoders.
+    """
+    kind = _get_hint_kind(type(x))
+    if kind == _KIND_SCALAR or kind == _KIND_NONE:
+        return x
+    if kind == _KIND_LIST:
+        return [_decode_any(e) for e in x]
+    if kind == _KIND_DICT:
+        for k in x:
+            if not isinstance(k, str):
+                raise NotImplementedError("dict with non-str keys is not supported")
+        return {k: _decode_any(v) for k, v in x.items()}
+    return JSONAble.get_decoder(type(x))(x)
+
+
 # Utils
 def _is_generics(t) -> bool:
     """Returns whether the given type `t` is a generics type."""
@@ -646,11 +3324,239 @@ def _is_jsonable_like(t) -> bool:
     return False
 
 
-def _replace_mapping_proxy(m: MappingProxyType, kwds) -> MappingProxyType:
-    """Copy a MappingProxyType `m`, and update it with `kwds`."""
-    d = dict(m)
-    d.update(**kwds)
-    return MappingProxyType(d)
+def _is_plain_record(t) -> bool:
+    """Returns whether the given type `t` is a plain dataclass, NamedTuple or
+    TypedDict, which can be converted by the field plans of its adapter, see
+    `_get_record_adapter`.
+    """
+    if not isinstance(t, type):
+        return False
+    if is_dataclass(t):
+        return True
+    if issubclass(t, tuple):
+        return hasattr(t, "_fields")
+    if issubclass(t, dict):
+        return hasattr(t, "__total__")
+    return False
+
+
+# Adapters of plain records, by type, see `_get_record_adapter`.
+_record_adapters: Dict[type, Type[JSONAble]] = {}
+
+
+def _get_record_adapter(t: type) -> Type[JSONAble]:
+    """Returns the adapter of plain dataclass, NamedTuple or TypedDict `t`.
+    The adapter is a `JSONAble` class whose field plans convert instances of `t`,
+    without `t` inheriting from `JSONAble`, and without reflection at conversion.
+    Adapters are made once per type.
+    """
+    adapter = _record_adapters.get(t)
+    if adapter is not None:
+        return adapter
+    with _build_lock:
+        adapter = _record_adapters.get(t)
+        if adapter is None:
+            adapter = _record_adapters[t] = _make_record_adapter(t)
+        return adapter
+
+
+def _make_record_adapter(t: type) -> Type[JSONAble]:
+    """Makes the adapter of plain dataclass, NamedTuple or TypedDict `t`, see
+    `_get_record_adapter`. Like parameterized generics, the adapter constructs
+    instances of `t`, by the type hints of `t` installed in advance.
+    """
+    hints = get_type_hints(t)
+    fields: Dict[str, Field]
+    no_init: Tuple[str, ...] = ()
+    if is_dataclass(t):
+        # Excludes ClassVar and InitVar pseudo-fields.
+        fields = {f.name: f for f in dataclasses.fields(t)}
+        no_init = tuple(f.name for f in fields.values() if not f.init)
+    elif issubclass(t, tuple):
+        # NamedTuple, or namedtuple whose fields are not annotated.
+        defaults = getattr(t, "_field_defaults", {})
+        fields = {
+            name: _make_record_field(name, defaults.get(name, MISSING))
+            for name in getattr(t, "_fields")
+        }
+        hints = {name: hints.get(name, Any) for name in fields}
+    else:
+        # TypedDict, keys not required are absent rather than defaulted.
+        total = getattr(t, "__total__", True)
+        required = getattr(t, "__required_keys__", hints if total else ())
+        fields = {
+            name: _make_record_field(name, MISSING if name in required else None)
+            for name in hints
+        }
+
+    ns = {
+        "__module__": t.__module__,
+        "__qualname__": t.__qualname__,
+        "__dataclass_fields__": fields,
+        "__dataclass_jsonable_origin__": t,
+        "__dataclass_jsonable_hints__": hints,
+        "__dataclass_jsonable_no_init__": no_init,
+    }
+    return type(t.__name__, (JSONAble,), ns)
+
+
+def _make_record_field(name: str, default: Any) -> Field:
+    """Makes a dataclass field named `name` for a NamedTuple or TypedDict."""
+    f = dataclasses.field(default=default)
+    f.name = name
+    return f
+
+
+def _encode_typed_dict(x: JSON, plan: List["_FieldPlan"]) -> JSON:
+    """Encodes TypedDict `x` by the field plans of its adapter, like `_json`.
+    Keys absent in `x` are absent in the encoded dictionary as well.
+    """
+    d: JSON = {}
+    for p in plan:
+        if p.skip or p.name not in x:
+            continue
+
+        v = x[p.name]
+
+        omitempty = p.omitempty
+        if omitempty:
+            if omitempty == _OMITEMPTY_NONE:
+                if v is None:
+                    continue
+            elif omitempty == _OMITEMPTY_FALSY:
+                if not v:
+                    continue
+            elif p.omitempty_tester(v):
+                continue
+
+        d[p.key] = p.encoder(v)
+    return d
+
+
+def _get_plan_base(cls) -> Optional[Type[JSONAble]]:
+    """Returns the base dataclass of class `cls` whose field plans can be reused by
+    `cls`, or None if there's no such one.
+    """
+    if "__dataclass_jsonable_origin__" in cls.__dict__:
+        # Parameterized generic, the types differ from the generic class's.
+        return None
+    for base in cls.__bases__:
+        if issubclass(base, JSONAble) and "__dataclass_fields__" in base.__dict__:
+            break
+    else:
+        return None
+
+    if base.__default_json_options__ is not cls.__default_json_options__:
+        return None
+    # Methods that the plans depend on shouldn't be overridden.
+    for attr in ("get_encoder", "get_decoder", "_get_json_options"):
+        f1, f2 = getattr(cls, attr), getattr(base, attr)
+        if getattr(f1, "__func__", f1) is not getattr(f2, "__func__", f2):
+            return None
+    return base
+
+
+def _make_generic_class(cls, args: Tuple[TypingHint, ...]) -> type:
+    """Makes the subclass of generic dataclass `cls` parameterized by `args`, see
+    `JSONAble.__class_getitem__`. The substituted type hints are installed like
+    the ones loaded from a schema cache.
+    """
+    mapping = dict(zip(cls.__parameters__, args))
+    hints = {
+        name: _substitute_type_vars(t, mapping)
+        for name, t in get_type_hints(cls).items()
+    }
+    names = ", ".join(getattr(a, "__name__", None) or repr(a) for a in args)
+
+    def __new__(c, *args, **kwargs):
+        if c is generic:
+            # Instances are of the generic class, e.g. `Page[Order](...)` gives a
+            # `Page`, the same as the decoded ones.
+            return cls(*args, **kwargs)
+        # Dataclasses extending this class.
+        new = super(generic, c).__new__
+        return new(c) if new is object.__new__ else new(c, *args, **kwargs)
+
+    ns = {
+        "__module__": cls.__module__,
+        "__qualname__": f"{cls.__qualname__}[{names}]",
+        "__new__": __new__,
+        # Shares the fields, so that dataclasses can extend this class.
+        "__dataclass_fields__": cls.__dataclass_fields__,
+        "__dataclass_jsonable_origin__": cls,
+        "__dataclass_jsonable_hints__": hints,
+    }
+    generic = type(f"{cls.__name__}[{names}]", (cls,), ns)
+    return generic
+
+
+def _substitute_type_vars(t: TypingHint, mapping: Dict[V, TypingHint]) -> TypingHint:
+    """Substitutes the type variables in type hint `t` by `mapping`."""
+    if isinstance(t, TypeVar):
+        return mapping.get(t, t)
+    params = getattr(t, "__parameters__", None)
+    if params and not isinstance(t, type):
+        # Generic aliases, e.g. List[T], substitute their parameters in order.
+        return t[tuple(mapping.get(p, p) for p in params)]
+    return t
+
+
+def _get_own_type_hints(cls) -> Dict[str, TypingHint]:
+    """Returns the type hints of the annotations declared in class `cls` itself,
+    excluding the inherited ones, which `get_type_hints(cls)` would also evaluate.
+    """
+    annotations = cls.__dict__.get("__annotations__", {})
+    # A class declaring only these annotations, in the same module.
+    t = type(cls.__name__, (), {"__annotations__": dict(annotations)})
+    t.__module__ = cls.__module__
+    # Names in the module take precedence over the names in the class, as what
+    # `get_type_hints(cls)` does.
+    try:
+        return get_type_hints(
+            t, globalns=dict(vars(cls)), localns=sys.modules[cls.__module__].__dict__
+        )
+    except (NameError, TypeError, AttributeError):
+        return get_type_hints(cls)
+
+
+def _merge_json_options(
+    options: json_options, field_options: Optional[json_options]
+) -> json_options:
+    """Returns the json_options to use for a field, from the class-level `options`
+    and field-level `field_options` (may be None). Options set at field-level take
+    precedence.
+    """
+    if not field_options:
+        return options
+
+    # kwds1 is arguments that were set in field_options.
+    kwds1 = {k: v for k, v in field_options.__dict__.items() if v is not None}
+    # kwds2 is arguments that were set at class-level.
+    kwds2 = {k: v for k, v in options.__dict__.items() if v is not None}
+    # kwds1 first (aka field-level options first).
+    kwds2.update(kwds1)
+    # And we should make a new json_options.
+    return json_options(**kwds2)
+
+
+def _eval_forward_ref(cls, t: TypingHint) -> TypingHint:
+    """Evaluates `t` if it's a string or ForwardRef, with the namespaces (globals) of
+    the module of class `cls`. Returns `t` itself for other types.
+    """
+    if isinstance(t, str):
+        # NOTE: for py<3.9, the module keyword argument is not available.
+        if sys.version_info.minor < 9:
+            t = ForwardRef(t)
+        else:
+            t = ForwardRef(t, module=cls.__module__)  # type: ignore
+    if isinstance(t, ForwardRef):
+        if sys.version_info.minor < 9:
+            globalns = sys.modules[cls.__module__].__dict__
+            return t._evaluate(globalns, globalns)  # type: ignore
+        # after 3.9+ the globalns and locals respects to
+        # ForwardRef.__forwared_module__'s globalns
+        return t._evaluate(None, None, frozenset())  # type: ignore
+    return t
 
 
 def _is_class_var(t) -> bool:
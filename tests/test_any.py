@@ -25,15 +25,16 @@ def test_any():
         }
     )
     d = a.json()
+    # Sets are encoded to lists.
     assert d == {
         "B": {
             "abc": 2,
             "efg": [4, 5, 6],
             "dct": {"x": "y"},
-            "set": {1, 2, 3},
+            "set": [1, 2, 3],
             "empty_dict": {},
             "empty_list": [],
-            "empty_set": set(),
+            "empty_set": [],
             "n": None,
         }
     }
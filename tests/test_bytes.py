@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from dataclass_jsonable import J, json_options
+
+
+class Status(Enum):
+    ON = "on"
+    OFF = "off"
+
+
+@dataclass
+class Brand(J):
+    name: str
+    rank: int = 0
+
+
+@dataclass
+class Product(J):
+    sku: str
+    price: Decimal
+    status: Status
+    created_at: datetime
+    brand: Optional[Brand] = None
+    brands: List[Brand] = field(default_factory=list)
+    by_region: Dict[str, Brand] = field(default_factory=dict)
+    scores: List[float] = field(default_factory=list)
+    extra: Any = None
+    note: str = field(default="", metadata={"j": json_options(omitempty=True)})
+    big: int = -(2**70)
+    flag: bool = True
+
+
+def test_bytes():
+    o = Product(
+        sku="p1",
+        price=Decimal("1.5"),
+        status=Status.ON,
+        created_at=datetime.fromtimestamp(1),
+        brand=Brand("acme", -3),
+        brands=[Brand("a"), Brand("b", 2**40)],
+        by_region={"cn": Brand("c")},
+        scores=[0.5, -1.25],
+        extra={"k": [1, None, "v"]},
+    )
+    b = o.to_bytes()
+    assert Product.from_bytes(b) == o
+    assert len(b) < len(str(o.json()))
+
+
+def test_bytes_schema_mismatch():
+    b = Brand("acme").to_bytes()
+    with pytest.raises(ValueError):
+        Product.from_bytes(b)
+    with pytest.raises(ValueError):
+        Brand.from_bytes(b + b"\x00")
+
+
+def test_bytes_truncated():
+    b = Product("p1", Decimal("1.5"), Status.ON, datetime.fromtimestamp(1)).to_bytes()
+    for i in range(len(b)):
+        with pytest.raises(ValueError):
+            Product.from_bytes(b[:i])
+
+
+@dataclass
+class Money(J):
+    cents: int = 0
+
+    def json(self, *args, **kwargs):
+        return {"amount": self.cents / 100}
+
+    @classmethod
+    def from_json(cls, d, fields=None):
+        return cls(round(d["amount"] * 100))
+
+
+@dataclass
+class Order(J):
+    price: Money
+    extra: Any = None
+
+
+def test_bytes_overridden_nested():
+    o = Order(Money(150))
+    assert Order.from_bytes(o.to_bytes()) == o
+
+
+def test_bytes_corrupt():
+    b = bytearray(Order(Money(150), "x").to_bytes())
+    # The tag of an object where no nested value is held.
+    b[-3] = 8
+    with pytest.raises(ValueError, match="invalid type tag"):
+        Order.from_bytes(bytes(b))
@@ -0,0 +1,103 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+
+import pytest
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass(frozen=True)
+class Brand(J):
+    name: str
+    rank: float = 0.0
+
+
+@dataclass
+class Product(J):
+    sku: str
+    price: Decimal
+    tags: Set[str] = field(default_factory=set)
+    brands: List[Brand] = field(default_factory=list)
+    by_id: Dict[int, Brand] = field(default_factory=dict)
+    ids: FrozenSet[int] = frozenset()
+    extra: Any = None
+    alias: str = field(default="", metadata={"j": json_options(name="Alias")})
+    note: Optional[str] = field(
+        default=None, metadata={"j": json_options(omitempty=True)}
+    )
+
+
+def test_canonical():
+    o = Product(
+        "p1",
+        Decimal("1.50"),
+        {"b", "c", "a"},
+        [Brand("x", 2.0)],
+        {10: Brand("y"), 2: Brand("z", 0.5)},
+        frozenset({3, 1, 2}),
+        {"z": 1.0, "a": [Decimal("2.00"), {"y": 1, "b": -0.0}]},
+    )
+    d = o.json(canonical=True)
+    assert list(d) == sorted(d)
+    assert "note" not in d
+    assert d["price"] == "1.5"
+    assert d["tags"] == ["a", "b", "c"]
+    assert d["brands"] == [{"name": "x", "rank": 2}]
+    assert list(d["by_id"]) == ["10", "2"]
+    assert d["ids"] == [1, 2, 3]
+    assert d["extra"] == {"a": ["2", {"b": 0, "y": 1}], "z": 1}
+    assert list(d["extra"]["a"][1]) == ["b", "y"]
+
+    # Equal values, of different forms.
+    o2 = Product(
+        "p1",
+        Decimal("1.5"),
+        {"c", "a", "b"},
+        [Brand("x", 2)],
+        {2: Brand("z", 0.5), 10: Brand("y")},
+        frozenset({2, 3, 1}),
+        {"a": [Decimal("2"), {"b": 0, "y": 1}], "z": 1},
+    )
+    assert o2.json(canonical=True) == d
+    assert o2.content_hash() == o.content_hash()
+    assert o.json(canonical=True, fields=["sku"]) == {"sku": "p1"}
+
+
+def test_canonical_decimal():
+    for v, s in [("100", "100"), ("1E+2", "100"), ("-0.00", "0"), ("0.10", "0.1")]:
+        assert Product("p", Decimal(v)).json(canonical=True)["price"] == s
+
+
+def test_content_hash():
+    o = Product("p1", Decimal("1.5"), extra=[{"k": i} for i in range(200)])
+    text = json.dumps(o.json(canonical=True), separators=(",", ":"))
+    assert o.content_hash() == hashlib.sha256(text.encode()).hexdigest()
+    assert Product("p1", Decimal("1.5")).content_hash() != o.content_hash()
+
+    with pytest.raises(ValueError):
+        Product("p1", Decimal(1), extra=float("nan")).content_hash()
+
+
+@dataclass(frozen=True)
+class Cached(J):
+    __json_hash_cache__ = True
+
+    items: List[str]
+
+
+def test_content_hash_cache():
+    o = Cached(["a"])
+    h = o.content_hash()
+    o.items.append("b")
+    assert o.content_hash() == h
+    assert Cached(["a", "b"]).content_hash() != h
+
+    @dataclass
+    class NotFrozen(J):
+        __json_hash_cache__ = True
+
+    with pytest.raises(TypeError):
+        NotFrozen().content_hash()
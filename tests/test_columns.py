@@ -0,0 +1,126 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import IntEnum
+from typing import List, Optional
+
+import pytest
+
+from dataclass_jsonable import DecodeContext, DecodeError, J, json_options, zero
+
+
+class Side(IntEnum):
+    BUY = 1
+    SELL = 2
+
+
+@dataclass
+class Trade(J):
+    price: float
+    size: int
+    side: Side
+    at: datetime = field(metadata={"j": json_options(name="time")})
+    note: Optional[str] = field(
+        default=None, metadata={"j": json_options(omitempty=True)}
+    )
+    tags: List[str] = field(default_factory=list)
+    secret: str = field(default="", metadata={"j": json_options(skip=True)})
+
+
+trades = [
+    Trade(1.5, 10, Side.BUY, datetime.fromtimestamp(1660000000), tags=["a"]),
+    Trade(2.5, 20, Side.SELL, datetime.fromtimestamp(1660000001), note="n"),
+]
+
+columns = {
+    "price": [1.5, 2.5],
+    "size": [10, 20],
+    "side": [1, 2],
+    "time": [1660000000, 1660000001],
+    "note": [None, "n"],
+    "tags": [["a"], []],
+}
+
+
+def test_to_columns():
+    assert Trade.to_columns(trades) == columns
+    assert Trade.to_columns(iter(trades)) == columns
+    assert Trade.to_columns([]) == {k: [] for k in columns}
+
+
+def test_to_columns_arrays():
+    c = Trade.to_columns(trades, arrays=True)
+    assert c["price"] == array("d", [1.5, 2.5])
+    assert c["size"] == array("q", [10, 20])
+    assert c["side"] == [1, 2]
+    assert c["tags"] == [["a"], []]
+
+
+def test_from_columns():
+    assert Trade.from_columns(columns) == trades
+    assert Trade.from_columns(Trade.to_columns(trades, arrays=True)) == trades
+
+
+def test_from_columns_missing():
+    c = {k: v for k, v in columns.items() if k not in ("note", "tags")}
+    assert Trade.from_columns(c) == [
+        Trade(t.price, t.size, t.side, t.at) for t in trades
+    ]
+
+
+def test_from_columns_length_mismatch():
+    with pytest.raises(ValueError):
+        Trade.from_columns({"price": [1.0], "size": [1, 2]})
+
+
+@dataclass
+class Row(J):
+    __default_factory__ = zero
+
+    a: int
+    b: List[int]
+    c: str = field(
+        default="x", metadata={"j": json_options(default_before_decoding="y")}
+    )
+
+
+def test_from_columns_default_factory():
+    rows = Row.from_columns({"a": [1, 2]})
+    assert rows == [Row(1, [], "y"), Row(2, [], "y")]
+    assert rows[0].b is not rows[1].b
+
+    # Only columns of default_before_decoding.
+    assert Row.from_columns({}) == []
+    assert Row.from_columns({"b": [[1]]}) == [Row(0, [1], "y")]
+
+
+def test_from_columns_origin_json():
+    rows = Row.from_columns({"a": [1, 2], "b": [[1], [2]]})
+    assert rows[1]._get_origin_json() == {"a": 2, "b": [2]}
+
+
+def test_from_columns_decode_error():
+    c = dict(columns, time=[1660000000, "x"])
+    with pytest.raises(DecodeError) as e:
+        Trade.from_columns(c)
+    assert e.value.path == "time"
+    assert e.value.index == 1
+
+    c = {k: v for k, v in columns.items() if k != "size"}
+    with pytest.raises(TypeError) as e2:
+        Trade.from_columns(c)
+    assert isinstance(e2.value, DecodeError)
+    assert e2.value.index == 0
+
+
+@dataclass(frozen=True)
+class Tick(J):
+    symbol: str
+    price: float
+
+
+def test_from_columns_context():
+    with DecodeContext(dedup=True):
+        ticks = Tick.from_columns({"symbol": ["a", "a", "b"], "price": [1, 1, 1]})
+    assert ticks[0] is ticks[1]
+    assert ticks[1] is not ticks[2]
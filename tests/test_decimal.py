@@ -0,0 +1,42 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List, Optional
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass
+class Price(J):
+    amount: Decimal
+    tax: Optional[Decimal] = None
+
+
+def test_decimal_decode():
+    assert Price.from_json({"amount": "1.10"}).amount.as_tuple().exponent == -2
+    assert Price.from_json({"amount": 0.1}).amount == Decimal("0.1")
+    assert Price.from_json({"amount": 3}).amount == Decimal(3)
+    assert Price.from_json({"amount": "1", "tax": 2.5}).tax == Decimal("2.5")
+
+
+@dataclass
+class Ledger(J):
+    __default_json_options__ = json_options(decimal_places=2)
+
+    amount: Decimal
+    fee: Optional[Decimal] = None
+    rate: Decimal = field(
+        default=Decimal(0), metadata={"j": json_options(decimal_places=4)}
+    )
+    items: List[str] = field(default_factory=list)
+
+
+def test_decimal_places():
+    o = Ledger.from_json({"amount": "1.005", "fee": 0.1, "rate": "0.12345"})
+    assert str(o.amount) == "1.00"
+    assert str(o.fee) == "0.10"
+    assert str(o.rate) == "0.1234"
+    assert Ledger.from_json({"amount": "3"}).fee is None
+
+    o = Ledger(Decimal("2.5"), rate=Decimal("1"), items=["a"])
+    assert o.json() == {"amount": "2.50", "fee": None, "rate": "1.0000", "items": ["a"]}
+    assert Ledger(Decimal("1E+30")).json()["amount"] == "1" + "0" * 30 + ".00"
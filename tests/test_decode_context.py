@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from dataclass_jsonable import DecodeContext, J
+
+
+@dataclass(frozen=True)
+class Person(J):
+    name: str
+    country: str
+
+
+@dataclass
+class Order(J):
+    status: str
+    owner: Person
+    tags: List[str] = field(default_factory=list)
+
+
+def make_payloads(n):
+    # Builds distinct string objects, like a json parser does.
+    return [
+        {
+            "status": "".join(["do", "ne"]),
+            "owner": {"name": "".join(["Ja", "ck"]), "country": "".join(["C", "N"])},
+            "tags": ["".join(["a", "b"])],
+        }
+        for _ in range(n)
+    ]
+
+
+def test_decode_context_intern_strings():
+    with DecodeContext(dedup=False):
+        orders = [Order.from_json(d) for d in make_payloads(3)]
+    assert orders[0] == orders[1] == orders[2]
+    assert orders[0].status is orders[1].status
+    assert orders[0].tags[0] is orders[2].tags[0]
+    assert orders[0].owner is not orders[1].owner
+    assert orders[0].owner.country is orders[1].owner.country
+
+
+def test_decode_context_intern_max_length():
+    ctx = DecodeContext(intern_max_length=3)
+    orders = Order.from_json_many(make_payloads(2), context=ctx)
+    assert orders[0].status is not orders[1].status
+    assert orders[0].owner.country is orders[1].owner.country
+
+
+def test_decode_context_dedup():
+    orders = Order.from_json_many(make_payloads(3), context=DecodeContext())
+    assert orders[0].owner is orders[1].owner is orders[2].owner
+    # Non-frozen dataclasses are not deduplicated.
+    assert orders[0] is not orders[1]
+
+
+def test_decode_context_dedup_maxsize():
+    ctx = DecodeContext(dedup_maxsize=1)
+    with ctx:
+        a1 = Person.from_json({"name": "a", "country": "CN"})
+        b1 = Person.from_json({"name": "b", "country": "CN"})
+        a2 = Person.from_json({"name": "a", "country": "CN"})
+        a3 = Person.from_json({"name": "a", "country": "CN"})
+    assert a1 == a2 and a1 is not a2
+    assert b1 is not a2
+    assert a2 is a3
+
+
+def test_decode_context_disabled():
+    orders = Order.from_json_many(make_payloads(2))
+    assert orders[0] == orders[1]
+    assert orders[0].status is not orders[1].status
+    assert orders[0].owner is not orders[1].owner
@@ -0,0 +1,123 @@
+import pickle
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytest
+
+from dataclass_jsonable import DecodeError, DecodeTypeError, J, json_options
+
+
+@dataclass
+class Creator(J):
+    name: str
+    registered_at: datetime
+
+
+@dataclass
+class Owner(J):
+    name: str
+    creators: List[Creator] = field(default_factory=list)
+    by_name: Dict[str, Creator] = field(default_factory=dict)
+
+
+@dataclass
+class Repository(J):
+    owner: Owner
+    stars: int = field(default=0, metadata={"j": json_options(name="Stars")})
+    __json_iterative__ = False
+
+
+@dataclass
+class IterativeRepository(J):
+    __json_iterative__ = True
+
+    owner: Optional[Owner] = None
+
+
+def make(creators, by_name=None):
+    return {"owner": {"name": "o", "creators": creators, "by_name": by_name or {}}}
+
+
+ok = {"name": "c", "registered_at": 1}
+
+
+@pytest.mark.parametrize("cls", [Repository, IterativeRepository])
+def test_decode_error_path(cls):
+    d = make([ok, ok, ok, {"name": "c", "registered_at": "x"}])
+    with pytest.raises(DecodeError) as e:
+        cls.from_json(d)
+    assert e.value.path == "owner.creators[3].registered_at"
+    assert isinstance(e.value.error, ValueError)
+    assert e.value.doc is d["owner"]["creators"][3]
+    assert e.value.root is d
+    assert str(e.value).startswith("owner.creators[3].registered_at: ")
+
+
+@pytest.mark.parametrize("cls", [Repository, IterativeRepository])
+def test_decode_error_missing(cls):
+    d = make([ok], {"a.b": {"name": "c"}})
+    with pytest.raises(DecodeError) as e:
+        cls.from_json(d)
+    assert e.value.path == "owner.by_name.a.b"
+    assert e.value.key is None
+    assert isinstance(e.value.error, TypeError)
+    # Also a TypeError, as it was before wrapped.
+    assert isinstance(e.value, DecodeTypeError)
+    with pytest.raises(TypeError, match="missing 1 required positional argument"):
+        cls.from_json(d)
+
+
+def test_decode_error_top_level():
+    with pytest.raises(DecodeError) as e:
+        Repository.from_json({"owner": {"name": "o"}, "Stars": "x"})
+    assert e.value.path == "Stars"
+    assert isinstance(e.value, ValueError)
+
+
+def test_decode_error_pickle():
+    with pytest.raises(DecodeError) as e:
+        Repository.from_json({"owner": {"name": "o"}, "Stars": "x"})
+    assert pickle.loads(pickle.dumps(e.value)).path == "Stars"
+
+
+def test_from_json_batch():
+    bad = {"name": "c", "registered_at": "x"}
+    ds = [make([ok]), make([ok, bad]), None, make([]), make([bad])]
+    objs, errors = Repository.from_json_batch(ds)
+    assert objs == [Repository.from_json(ds[0]), Repository.from_json(ds[3])]
+    assert [e.index for e in errors] == [1, 2, 4]
+    assert errors[0].path == "owner.creators[1].registered_at"
+    assert errors[2].path == "owner.creators[0].registered_at"
+
+    objs, errors = Repository.from_json_batch(ds, max_errors=1)
+    assert len(objs) == 2
+    assert [e.index for e in errors] == [1]
+
+
+def test_decode_error_pickle_index():
+    _, errors = Repository.from_json_batch([make([{"name": "c"}])])
+    e = pickle.loads(pickle.dumps(errors[0]))
+    assert e.index == 0
+    assert e.path == "owner.creators[0]"
+
+
+@dataclass
+class Unsupported(J):
+    x: complex = 0j
+
+
+def test_decode_error_not_implemented():
+    # Schema errors are not wrapped, and fail a batch fast.
+    with pytest.raises(NotImplementedError):
+        Unsupported.from_json({"x": 1})
+    with pytest.raises(NotImplementedError):
+        Unsupported.from_json_batch([{"x": 1}, {"x": 2}])
+
+
+def test_decode_type_error_pickle():
+    with pytest.raises(DecodeTypeError) as e:
+        Repository.from_json({})
+    e2 = pickle.loads(pickle.dumps(e.value))
+    assert type(e2) is DecodeTypeError
+    assert isinstance(e2.error, TypeError)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from dataclass_jsonable import J, zero
 
@@ -108,3 +108,20 @@ def test_default_overload():
     assert x.y.e == ""
     assert x.y.k == "abc"
     assert x.m.z == []
+
+
+@dataclass
+class U(E):
+    a: Union[A, B]
+    b: Union[int, str]
+    c: Union[str, int, None]
+
+
+def test_default_union():
+    u = U.from_json({})
+    assert u.a == A(0)
+    assert u.b == 0
+    assert u.c is None
+    # The factory isn't called for present keys.
+    u = U(B(A(2)), "s", 1)
+    assert U.from_json(u.json()) == u
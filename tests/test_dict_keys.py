@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum, IntEnum
+from typing import Dict
+
+import pytest
+
+from dataclass_jsonable import J
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Level(IntEnum):
+    LOW = 0
+    HIGH = 1
+
+
+@dataclass
+class Price(J):
+    amount: int
+
+
+@dataclass
+class Obj(J):
+    a: Dict[int, Price] = field(default_factory=dict)
+    b: Dict[Color, int] = field(default_factory=dict)
+    c: Dict[Level, str] = field(default_factory=dict)
+    d: Dict[Decimal, int] = field(default_factory=dict)
+    e: Dict[date, int] = field(default_factory=dict)
+
+
+def test_dict_keys():
+    o = Obj(
+        a={1: Price(10), 2: Price(20)},
+        b={Color.RED: 1},
+        c={Level.LOW: "x", Level.HIGH: "y"},
+        d={Decimal("1.5"): 1},
+        e={date(2022, 1, 2): 3},
+    )
+    x = {
+        "a": {"1": {"amount": 10}, "2": {"amount": 20}},
+        "b": {"red": 1},
+        "c": {"0": "x", "1": "y"},
+        "d": {"1.5": 1},
+        "e": {"2022-01-02": 3},
+    }
+    assert o.json() == x
+    assert Obj.from_json(x) == o
+
+
+def test_dict_keys_invalid():
+    with pytest.raises(ValueError):
+        Obj.from_json({"b": {"green": 1}})
+
+
+def test_dict_keys_not_supported():
+    @dataclass
+    class A(J):
+        a: Dict[datetime, int]
+
+    with pytest.raises(NotImplementedError):
+        A({datetime.fromtimestamp(1): 1}).json()
@@ -0,0 +1,100 @@
+from dataclasses import dataclass, field
+from typing import Dict, Generic, List, Optional, TypeVar
+
+import pytest
+
+from dataclass_jsonable import J
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+
+@dataclass
+class Order(J):
+    id: int
+
+
+@dataclass
+class User(J):
+    name: str
+
+
+@dataclass
+class Page(J, Generic[T]):
+    items: List[T] = field(default_factory=list)
+    first: Optional[T] = None
+    total: int = 0
+
+
+@dataclass
+class Pair(J, Generic[K, T]):
+    data: Dict[str, T]
+    key: K
+
+
+def test_generic_dataclass():
+    d = {"items": [{"id": 1}, {"id": 2}], "first": {"id": 1}, "total": 2}
+    page = Page[Order].from_json(d)
+    assert type(page) is Page
+    assert page == Page([Order(1), Order(2)], Order(1), 2)
+    assert page.json() == d
+
+    users = Page[User].from_json({"items": [{"name": "a"}]})
+    assert users == Page([User("a")])
+
+
+def test_generic_dataclass_instances():
+    page = Page[Order]([Order(1)], total=1)
+    assert type(page) is Page
+    assert page == Page[Order].from_json(page.json())
+    pages = Page[Order].from_columns({"items": [[{"id": 1}]], "total": [1]})
+    assert pages == [page]
+    assert type(pages[0]) is Page
+
+
+def test_generic_dataclass_cached():
+    assert Page[Order] is Page[Order]
+    assert Page[Order] is not Page[User]
+    assert Page[Order]._get_plan() is not Page[User]._get_plan()
+    assert Page[Order]._get_plan() is not Page._get_plan()
+
+
+def test_generic_dataclass_multiple_params():
+    pair = Pair[int, Order].from_json({"data": {"a": {"id": 1}}, "key": "2"})
+    assert pair == Pair({"a": Order(1)}, 2)
+
+
+@dataclass
+class Response(J):
+    orders: Page[Order]
+    users: Optional[Page[User]] = None
+
+
+def test_generic_dataclass_nested():
+    d = {"orders": {"items": [{"id": 1}], "first": None, "total": 1}, "users": None}
+    o = Response.from_json(d)
+    assert o == Response(Page([Order(1)], None, 1))
+    assert o.json() == d
+
+
+def test_generic_dataclass_unparameterized():
+    # Type variables fall back to Any.
+    page = Page.from_json({"items": [{"id": 1}]})
+    assert page.items == [{"id": 1}]
+
+
+@dataclass
+class OrderPage(Page[Order]):
+    cursor: str = ""
+
+
+def test_generic_dataclass_subclass():
+    page = OrderPage.from_json({"items": [{"id": 1}], "cursor": "c"})
+    assert page == OrderPage([Order(1)], cursor="c")
+    assert type(OrderPage()) is OrderPage
+    assert page.json() == {"items": [{"id": 1}], "first": None, "total": 0, "cursor": "c"}
+
+
+def test_not_generic():
+    with pytest.raises(TypeError):
+        Order[int]
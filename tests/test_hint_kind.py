@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pytest
+
+from dataclass_jsonable import J
+
+
+@dataclass
+class Item(J):
+    name: str
+
+
+@dataclass
+class Obj(J):
+    a: Any = None
+    b: Dict[str, Any] = field(default_factory=dict)
+
+
+def test_any_reflection():
+    payload = {"x": [1, 2.5, "s", None, True, {"y": [{"z": 1}]}], "i": Item("a")}
+    d = Obj(a=payload).json()
+    assert d["a"] == {
+        "x": [1, 2.5, "s", None, True, {"y": [{"z": 1}]}],
+        "i": {"name": "a"},
+    }
+    assert Obj.from_json(d).a == d["a"]
+
+    with pytest.raises(NotImplementedError):
+        Obj(a={1: "x"}).json()
+    with pytest.raises(NotImplementedError):
+        Obj(a=(1, 2)).json()
+
+
+class Upper(J):
+    @classmethod
+    def get_encoder(cls, t):
+        if t is str:
+            return str.upper
+        return super().get_encoder(t)
+
+
+@dataclass
+class UpperObj(Upper):
+    a: Any = None
+
+
+def test_any_reflection_overridden():
+    # Overridden get_encoder is used for the values of Any.
+    assert UpperObj(a="x").json() == {"a": "X"}
+    assert UpperObj(a=["x"]).json() == {"a": ["X"]}
+
+
+def test_hint_kinds():
+    t = Tuple[int, str]
+    assert Obj.get_encoder(t)((1, "a")) == [1, "a"]
+    with pytest.raises(NotImplementedError):
+        Obj.get_encoder(Union)
+    assert Obj.get_decoder(Optional[List[Item]])([{"name": "a"}]) == [Item("a")]
@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import ClassVar, List, Optional
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass
+class Base(J):
+    kind: ClassVar[str] = "base"
+
+    id: int
+    created_at: datetime = field(default_factory=lambda: datetime.fromtimestamp(1))
+    tags: List[str] = field(default_factory=list)
+    note: Optional[str] = field(default=None, metadata={"j": json_options(name="Note")})
+
+
+@dataclass
+class Order(Base):
+    amount: int = 0
+
+
+@dataclass
+class OrderWithDefaults(Base):
+    __default_json_options__ = json_options(omitempty=True)
+
+    amount: int = 0
+
+
+@dataclass
+class OrderWithEncoder(Base):
+    amount: int = 0
+
+    @classmethod
+    def get_encoder(cls, t):
+        if t is int:
+            return str
+        return super().get_encoder(t)
+
+
+@dataclass
+class OrderRedefined(Base):
+    tags: List[str] = field(
+        default_factory=list, metadata={"j": json_options(omitempty=True)}
+    )
+
+
+def test_inheritance_reuses_plans():
+    base = Base._get_plan()
+    plan = Order._get_plan()
+    assert [p.name for p in plan] == ["id", "created_at", "tags", "note", "amount"]
+    assert plan[:4] == base
+    assert Order(1, amount=2).json() == {
+        "id": 1,
+        "created_at": 1,
+        "tags": [],
+        "Note": None,
+        "amount": 2,
+    }
+
+
+def test_inheritance_overridden_class_options():
+    assert not set(OrderWithDefaults._get_plan()) & set(Base._get_plan())
+    assert Base(1).json() == {"id": 1, "created_at": 1, "tags": [], "Note": None}
+    assert OrderWithDefaults(1).json() == {"id": 1, "created_at": 1}
+
+
+def test_inheritance_overridden_get_encoder():
+    assert OrderWithEncoder(1, amount=2).json() == {
+        "id": "1",
+        "created_at": 1,
+        "tags": [],
+        "Note": None,
+        "amount": "2",
+    }
+
+
+def test_inheritance_redefined_field():
+    plan = OrderRedefined._get_plan()
+    assert plan[0] is Base._get_plan()[0]
+    assert plan[2] is not Base._get_plan()[2]
+    assert OrderRedefined(1).json() == {"id": 1, "created_at": 1, "Note": None}
+
+
+@dataclass
+class Holiday(Base):
+    # The class attribute `date` shadows the module's `date` in annotations.
+    date: "date" = date(2022, 1, 1)
+    names: "List[str]" = field(default_factory=list)
+
+
+def test_inheritance_own_string_annotations():
+    h = Holiday(1, names=["new year"])
+    x = {
+        "id": 1,
+        "created_at": 1,
+        "tags": [],
+        "Note": None,
+        "date": "2022-01-01",
+        "names": ["new year"],
+    }
+    assert h.json() == x
+    assert Holiday.from_json(x) == h
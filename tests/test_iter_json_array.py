@@ -0,0 +1,76 @@
+import io
+import json
+from dataclasses import dataclass, field
+from typing import List
+
+import pytest
+
+from dataclass_jsonable import J
+
+
+@dataclass
+class Item(J):
+    id: int
+    name: str
+    price: float = 0.0
+    tags: List[str] = field(default_factory=list)
+
+
+items = [Item(i, f'n"{i}\\', i * 1.5, ["a", "[b]"] * (i % 3)) for i in range(50)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_iter_json_array(chunk_size):
+    s = json.dumps([o.json() for o in items], indent=2)
+    f = io.StringIO(s)
+    assert list(Item.iter_json_array(f, chunk_size=chunk_size)) == items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 65536])
+def test_iter_json_array_path(chunk_size):
+    doc = {
+        "meta": {"skip": [{"x": '}]\\"{'}, [1, 2]], "n": 12345, "s": "中文"},
+        "data": {"total": 50, "items": [o.json() for o in items], "after": 1},
+    }
+    f = io.BytesIO(json.dumps(doc, ensure_ascii=False).encode())
+    got = list(Item.iter_json_array(f, path="data.items", chunk_size=chunk_size))
+    assert got == items
+
+
+@dataclass
+class Point(J):
+    x: int
+    y: float
+
+
+def test_iter_json_array_numbers():
+    # Numbers split by the buffer end, e.g. "123" read as "12" and "3".
+    f = io.StringIO('[{"x": 1234567, "y": 2.5e10}, {"x": -3, "y": 1}]')
+    got = list(Point.iter_json_array(f, chunk_size=3))
+    assert got == [Point(1234567, 2.5e10), Point(-3, 1)]
+
+
+def test_iter_json_array_empty():
+    assert list(Item.iter_json_array(io.StringIO(" [ ] "))) == []
+
+
+def test_iter_json_array_invalid():
+    with pytest.raises(ValueError):
+        list(Item.iter_json_array(io.StringIO('{"data": []}'), path="items"))
+    with pytest.raises(ValueError):
+        list(Item.iter_json_array(io.StringIO('[{"id": 1, "name": "a"} {}]')))
+
+
+def test_iter_json_array_key_not_found():
+    f = io.StringIO('{"meta": {"n": 1}, "other": [1]}')
+    with pytest.raises(ValueError, match="key 'data' not found"):
+        list(Item.iter_json_array(f, path="data"))
+
+
+def test_iter_json_array_invalid_not_read_to_end():
+    # An invalid element fails without reading the rest of the file.
+    rest = ", ".join(json.dumps(o.json()) for o in items * 100)
+    f = io.StringIO(f'[{{"id": 1, "name": "a",, "x": 1}}, {rest}]')
+    with pytest.raises(ValueError):
+        list(Item.iter_json_array(f, chunk_size=64))
+    assert f.tell() < 1024
@@ -0,0 +1,119 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass
+class Comment(J):
+    __json_iterative__ = True
+    __default_json_options__ = json_options(omitempty=True)
+
+    text: str
+    reply: Optional["Comment"] = None
+
+
+def make_thread(depth: int) -> Comment:
+    c = Comment("0")
+    for i in range(1, depth):
+        c = Comment(str(i), reply=c)
+    return c
+
+
+def test_iterative_deep():
+    depth = sys.getrecursionlimit() * 3
+    c = make_thread(depth)
+    d = c.json()
+
+    n, x = 0, d
+    while x is not None:
+        n += 1
+        x = x.get("reply")
+    assert n == depth
+
+    c1 = Comment.from_json(d)
+    n, o = 0, c1
+    while o is not None:
+        n += 1
+        o = o.reply
+    assert n == depth
+    assert c1.text == str(depth - 1)
+    assert c1._get_origin_json() is d
+
+
+@dataclass
+class Leaf(J):
+    n: int
+    name: str = field(default="", metadata={"j": json_options(name="Name")})
+
+
+@dataclass
+class Branch(J):
+    leaf: Leaf
+    leaves: List[Leaf] = field(default_factory=list)
+    pair: Tuple[Leaf, ...] = ()
+    index: Dict[str, Leaf] = field(default_factory=dict)
+    maybe: Optional[Leaf] = None
+    children: List["Branch"] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    custom: Leaf = field(
+        default_factory=lambda: Leaf(0),
+        metadata={"j": json_options(encoder=lambda x: x.n, decoder=lambda x: Leaf(x))},
+    )
+
+
+@dataclass
+class IterativeBranch(Branch):
+    __json_iterative__ = True
+
+    children: List["IterativeBranch"] = field(default_factory=list)  # type: ignore
+
+
+def make_branch(cls):
+    return cls(
+        leaf=Leaf(1, "a"),
+        leaves=[Leaf(2), Leaf(3, "c")],
+        pair=(Leaf(4), Leaf(5)),
+        index={"x": Leaf(6)},
+        children=[cls(leaf=Leaf(7), maybe=Leaf(8)), cls(leaf=Leaf(9))],
+        tags=["t"],
+        custom=Leaf(10),
+    )
+
+
+def test_iterative_same_as_recursive():
+    b1 = make_branch(Branch)
+    b2 = make_branch(IterativeBranch)
+    d = b1.json()
+    assert b2.json() == d
+    assert IterativeBranch.from_json(d) == b2
+    assert Branch.from_json(d) == b1
+
+
+@dataclass
+class Money(J):
+    cents: int = 0
+
+    def json(self, *args, **kwargs):
+        return {"amount": self.cents / 100}
+
+    @classmethod
+    def from_json(cls, d, fields=None):
+        return cls(round(d["amount"] * 100))
+
+
+@dataclass
+class Order(J):
+    __json_iterative__ = True
+
+    price: Money
+    prices: List[Money] = field(default_factory=list)
+
+
+def test_iterative_overridden_nested():
+    # Nested classes overriding json or from_json are converted by them.
+    o = Order(Money(150), [Money(1)])
+    d = {"price": {"amount": 1.5}, "prices": [{"amount": 0.01}]}
+    assert o.json() == d
+    assert Order.from_json(d) == o
@@ -0,0 +1,131 @@
+import json
+import pickle
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pytest
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass(frozen=True)
+class Currency(J):
+    __json_cache__ = "copy"
+
+    code: str
+    digits: int = 2
+    aliases: List[str] = field(default_factory=list)
+    note: Optional[str] = field(
+        default=None, metadata={"j": json_options(omitempty=True)}
+    )
+
+
+def test_json_cache_copy():
+    c = Currency("USD", aliases=["$"])
+    x = {"code": "USD", "digits": 2, "aliases": ["$"]}
+    d1 = c.json()
+    assert d1 == x
+    # Mutating the returned copy doesn't poison the cache.
+    d1["code"] = "EUR"
+    d1["aliases"].append("US$")
+    assert c.json() == x
+    assert c.json() is not c.json()
+
+
+@dataclass(frozen=True)
+class Instrument(J):
+    __json_cache__ = "readonly"
+
+    symbol: str
+    currency: Currency
+
+
+def test_json_cache_readonly():
+    o = Instrument("AAPL", Currency("USD"))
+    d = o.json()
+    assert d == {
+        "symbol": "AAPL",
+        "currency": {"code": "USD", "digits": 2, "aliases": []},
+    }
+    with pytest.raises(TypeError):
+        d["symbol"] = "MSFT"  # type: ignore
+    with pytest.raises(TypeError):
+        d.update(symbol="MSFT")  # type: ignore
+    assert o.json() is d
+    assert json.loads(json.dumps(d)) == d
+
+
+@dataclass
+class Position(J):
+    instrument: Instrument
+    size: int
+
+
+def test_json_cache_readonly_nested_dumps():
+    # A cached child within an uncached parent.
+    o = Position(Instrument("AAPL", Currency("USD")), 10)
+    assert json.loads(json.dumps(o.json())) == o.json()
+    assert pickle.loads(pickle.dumps(o.json())) == o.json()
+
+
+@dataclass(frozen=True)
+class Country(J):
+    __json_cache__ = "shared"
+
+    code: str
+
+
+def test_json_cache_shared():
+    o = Country("CN")
+    assert o.json() is o.json()
+    assert o.json() == {"code": "CN"}
+
+
+@dataclass
+class Address(J):
+    country: Country
+    countries: List[Country] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class Listing(J):
+    __json_cache__ = "copy"
+
+    instrument: Instrument
+
+
+def test_json_cache_nested_not_leaked():
+    # Cached children within an uncached parent are copied.
+    cn = Country("CN")
+    d = Address(cn, [cn]).json()
+    d["country"]["code"] = "HACKED"
+    d["countries"][0]["code"] = "HACKED"
+    assert cn.json() == {"code": "CN"}
+    d = Address(cn, [cn]).json_into({"countries": [None]})
+    d["countries"][0]["code"] = "HACKED"
+    assert cn.json() == {"code": "CN"}
+
+    # A readonly child within a copied parent is mutable.
+    d = Listing(Instrument("AAPL", Currency("USD"))).json()
+    d["instrument"]["symbol"] = "MSFT"
+    assert type(d["instrument"]) is dict
+
+
+def test_json_cache_from_json_frozen():
+    x = {"code": "JPY", "digits": 0, "aliases": []}
+    c = Currency.from_json(x)
+    assert c == Currency("JPY", digits=0)
+    assert c._get_origin_json() is x
+    assert c.json() == x
+
+
+@dataclass
+class Mutable(J):
+    __json_cache__ = "copy"
+
+    a: int
+
+
+def test_json_cache_requires_frozen():
+    with pytest.raises(TypeError):
+        Mutable(1).json()
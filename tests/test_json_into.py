@@ -0,0 +1,87 @@
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass
+class Brand(J):
+    name: str
+
+
+@dataclass
+class Product(J):
+    sku: str
+    brand: Optional[Brand] = None
+    brands: List[Brand] = field(default_factory=list)
+    note: str = field(default="", metadata={"j": json_options(omitempty=True)})
+
+
+def test_json_into():
+    target = {}
+    o1 = Product("p1", Brand("a"), [Brand("b"), Brand("c")], "x")
+    d = o1.json_into(target)
+    assert d is target
+    assert d == o1.json()
+    brand, brands, first = d["brand"], d["brands"], d["brands"][0]
+
+    o2 = Product("p2", Brand("d"), [Brand("e"), Brand("f"), Brand("g")])
+    d = o2.json_into(target)
+    assert d == o2.json()
+    assert d["brand"] is brand
+    assert d["brands"] is brands
+    assert d["brands"][0] is first
+
+    o3 = Product("p3")
+    assert o3.json_into(target) == o3.json()
+
+
+def test_iter_json():
+    products = [Product(f"p{i}", Brand(f"b{i}"), [Brand("x")] * i) for i in range(5)]
+    lines = [json.dumps(d) for d in Product.iter_json(products)]
+    assert lines == [json.dumps(o.json()) for o in products]
+
+
+@dataclass
+class NC(J):
+    a: int = field(metadata={"j": json_options(name_choice=["a1", "a2"])})
+
+
+def test_json_into_name_choice():
+    objs = [NC.from_json({"a1": 1}), NC.from_json({"a2": 2}), NC(3)]
+    objs.append(NC.from_json({"a1": 4}))
+    # The same dictionary is yielded, copies it.
+    got = [dict(d) for d in NC.iter_json(objs)]
+    assert got == [{"a1": 1}, {"a2": 2}, {"a": 3}, {"a1": 4}]
+
+
+@dataclass
+class Animal(J):
+    name: str
+
+
+@dataclass
+class Dog(Animal):
+    bark: str = "woof"
+
+
+@dataclass
+class Cat(Animal):
+    meow: Optional[str] = field(
+        default=None, metadata={"j": json_options(omitempty=True)}
+    )
+
+
+@dataclass
+class Owner(J):
+    pet: Animal
+    pets: List[Animal] = field(default_factory=list)
+
+
+def test_json_into_other_classes():
+    target: dict = {}
+    objs = [Owner(Dog("a"), [Dog("b")]), Owner(Animal("c"), [Cat("d")])]
+    for o in objs:
+        assert o.json_into(target) == o.json()
+    assert target == {"pet": {"name": "c"}, "pets": [{"name": "d"}]}
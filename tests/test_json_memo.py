@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from dataclass_jsonable import J
+
+
+@dataclass
+class Brand(J):
+    name: str
+
+
+@dataclass
+class Product(J):
+    sku: str
+    brand: Brand
+
+
+@dataclass
+class Catalog(J):
+    products: List[Product]
+    featured: Optional[Brand] = None
+    brands: Dict[str, Brand] = field(default_factory=dict)
+
+
+acme = Brand("acme")
+catalog = Catalog(
+    products=[Product("p1", acme), Product("p2", acme), Product("p3", Brand("x"))],
+    featured=acme,
+    brands={"a/b": acme},
+)
+
+
+def test_json_memo():
+    d = catalog.json(memo=True)
+    assert d == catalog.json()
+    products = d["products"]
+    assert products[0]["brand"] is products[1]["brand"]
+    assert products[0]["brand"] is d["featured"] is d["brands"]["a/b"]
+    assert products[2]["brand"] is not products[0]["brand"]
+
+
+def test_json_refs():
+    d = catalog.json(refs=True)
+    # The full encoded value is at its first visited occurrence.
+    assert d["featured"] == {"name": "acme"}
+    ref = {"$ref": "#/featured"}
+    assert d["products"][0]["brand"] == ref
+    assert d["products"][1]["brand"] == ref
+    assert d["products"][2]["brand"] == {"name": "x"}
+    assert d["brands"] == {"a/b": ref}
+
+
+def test_json_refs_escape():
+    c = Catalog(products=[Product("p1", acme)], brands={"a/b~": acme})
+    d = c.json(refs=True)
+    assert d["brands"] == {"a/b~": {"name": "acme"}}
+    assert d["products"][0]["brand"] == {"$ref": "#/brands/a~1b~0"}
+
+
+@dataclass
+class Node(J):
+    name: str
+    next: Optional["Node"] = None
+    children: List["Node"] = field(default_factory=list)
+
+
+def test_json_memo_cycle():
+    a = Node("a")
+    b = Node("b", next=a)
+    a.children.append(b)
+    with pytest.raises(ValueError, match=r"cycle detected at #/children/0/next"):
+        a.json(memo=True)
+
+
+def test_json_memo_shared_not_cycle():
+    leaf = Node("leaf")
+    root = Node("root", next=leaf, children=[Node("c", next=leaf)])
+    assert root.json(memo=True) == root.json()
+
+
+@dataclass
+class Graph(J):
+    name: str
+    data: Any = None
+    nodes: List["Graph"] = field(default_factory=list)
+
+
+def test_json_memo_cycle_recursive():
+    # Cycles through the values encoded recursively, e.g. of Any.
+    g = Graph("g")
+    g.data = g
+    with pytest.raises(
+        ValueError, match=r"cycle detected, or nested too deep, at #/data"
+    ):
+        g.json(memo=True)
+
+    root = Graph("root", nodes=[Graph("a", data=[g])])
+    with pytest.raises(ValueError, match=r"at #/nodes/0/data"):
+        root.json(memo=True)
+
+
+@dataclass
+class Money(J):
+    cents: int = 0
+
+    def json(self, *args, **kwargs):
+        return {"amount": self.cents / 100}
+
+
+@dataclass
+class Order(J):
+    price: Money
+    discount: Optional[Money] = None
+
+
+def test_json_memo_overridden_nested():
+    # Nested classes overriding json are encoded by it.
+    price = Money(150)
+    o = Order(price, price)
+    d = {"price": {"amount": 1.5}, "discount": {"amount": 1.5}}
+    assert o.json() == d
+    assert o.json(memo=True) == d
+    assert o.json(refs=True) == d
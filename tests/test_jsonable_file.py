@@ -0,0 +1,106 @@
+import json
+import os
+from dataclasses import dataclass
+
+import pytest
+
+from dataclass_jsonable import J, JSONAbleFile
+
+
+@dataclass
+class Event(J):
+    id: int
+    name: str
+
+
+def write_events(path, n):
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(json.dumps(Event(i, f"e{i}").json()) + "\n")
+            if i % 3 == 0:
+                f.write("\n")
+
+
+def test_jsonable_file(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    write_events(path, 10)
+
+    with JSONAbleFile(Event, path, cache_size=2) as events:
+        assert len(events) == 10
+        assert events[0] == Event(0, "e0")
+        assert events[-1] == Event(9, "e9")
+        assert events[2:5] == [Event(i, f"e{i}") for i in range(2, 5)]
+        assert list(events) == [Event(i, f"e{i}") for i in range(10)]
+        assert len(events._cache) == 2
+        assert events[9] is events[9]
+        with pytest.raises(IndexError):
+            events[10]
+
+
+def test_jsonable_file_no_trailing_newline(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    with open(path, "w") as f:
+        f.write('{"id": 1, "name": "a"}\n{"id": 2, "name": "b"}')
+
+    with JSONAbleFile(Event, path) as events:
+        assert events[:] == [Event(1, "a"), Event(2, "b")]
+
+
+def test_jsonable_file_empty(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    open(path, "w").close()
+
+    with JSONAbleFile(Event, path) as events:
+        assert len(events) == 0
+        assert list(events) == []
+
+
+def test_jsonable_file_index(tmp_path, monkeypatch):
+    path = str(tmp_path / "events.jsonl")
+    index_path = str(tmp_path / "events.idx")
+    write_events(path, 5)
+
+    with JSONAbleFile(Event, path, index_path=index_path) as events:
+        assert len(events) == 5
+    assert os.path.exists(index_path)
+
+    # Reuses the persisted index.
+    def fail(self):
+        raise AssertionError("index should not be rebuilt")
+
+    monkeypatch.setattr(JSONAbleFile, "_build_index", fail)
+    with JSONAbleFile(Event, path, index_path=index_path) as events:
+        assert events[4] == Event(4, "e4")
+    monkeypatch.undo()
+
+    # Rebuilds the index once the file changed.
+    write_events(path, 7)
+    os.utime(path, ns=(0, 1))
+    with JSONAbleFile(Event, path, index_path=index_path) as events:
+        assert len(events) == 7
+
+
+def test_jsonable_file_index_corrupt(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    index_path = tmp_path / "events.idx"
+    write_events(path, 5)
+    with JSONAbleFile(Event, path, index_path=str(index_path)):
+        pass
+    data = index_path.read_bytes()
+
+    # Misaligned, truncated and garbage indexes are rebuilt.
+    for corrupt in (data[:-3], data[:-8], b"garbage"):
+        index_path.write_bytes(corrupt)
+        with JSONAbleFile(Event, path, index_path=str(index_path)) as events:
+            assert len(events) == 5
+            assert events[4] == Event(4, "e4")
+        assert index_path.read_bytes() == data
+
+
+def test_jsonable_file_whitespace_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    a, b = json.dumps(Event(0, "a").json()), json.dumps(Event(1, "b").json())
+    path.write_text(f"{a}\n   \n\t \r\n\n {b}\n  ")
+    with JSONAbleFile(Event, str(path)) as events:
+        assert len(events) == 2
+        assert list(events) == [Event(0, "a"), Event(1, "b")]
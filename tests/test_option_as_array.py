@@ -0,0 +1,93 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import pytest
+
+import dataclass_jsonable
+from dataclass_jsonable import J, json_options
+
+
+@dataclass
+class Series(J):
+    values: List[float] = field(metadata={"j": json_options(as_array="array")})
+    counts: Tuple[int, ...] = field(metadata={"j": json_options(as_array="array")})
+
+
+def test_option_as_array_stdlib():
+    x = {"values": [1.5, 2, 3.25], "counts": [1, 2, 3]}
+    s = Series.from_json(x)
+    assert s.values == array("d", [1.5, 2.0, 3.25])
+    assert s.counts == array("q", [1, 2, 3])
+    assert s.json() == {"values": [1.5, 2.0, 3.25], "counts": [1, 2, 3]}
+    # Plain lists are still encoded.
+    assert Series([1.0], (2,)).json() == {"values": [1.0], "counts": [2]}
+
+
+def test_option_as_array_numpy():
+    numpy = pytest.importorskip("numpy")
+
+    @dataclass
+    class S(J):
+        values: List[float] = field(metadata={"j": json_options(as_array="numpy")})
+        counts: List[int] = field(metadata={"j": json_options(as_array="numpy")})
+
+    s = S.from_json({"values": [1.5, 2], "counts": [1, 2]})
+    assert isinstance(s.values, numpy.ndarray)
+    assert s.values.dtype == numpy.float64
+    assert s.counts.dtype == numpy.int64
+    d = s.json()
+    assert d == {"values": [1.5, 2.0], "counts": [1, 2]}
+    assert type(d["counts"][0]) is int
+
+
+def test_option_as_array_numpy_fallback(monkeypatch):
+    monkeypatch.setattr(dataclass_jsonable, "_import_numpy", lambda: None)
+
+    @dataclass
+    class S(J):
+        values: List[float] = field(metadata={"j": json_options(as_array="numpy")})
+
+    assert S.from_json({"values": [1.5]}).values == array("d", [1.5])
+
+
+def test_option_as_array_unsupported():
+    # Ignored on fields that aren't numeric lists.
+    @dataclass
+    class S(J):
+        values: List[str] = field(metadata={"j": json_options(as_array="array")})
+
+    assert S.from_json({"values": ["a"]}).values == ["a"]
+
+    # Invalid values raise on conversion, the encoding still works.
+    @dataclass
+    class S2(J):
+        values: List[int] = field(metadata={"j": json_options(as_array="x")})
+
+    assert S2([1]).json() == {"values": [1]}
+    with pytest.raises(ValueError):
+        S2.from_json({"values": [1]})
+
+
+def test_option_as_array_classlevel():
+    numpy = pytest.importorskip("numpy")
+
+    @dataclass(eq=False)
+    class S(J):
+        __default_json_options__ = json_options(omitempty=True, as_array="numpy")
+
+        name: str
+        values: List[float]
+        counts: Optional[List[int]] = None
+
+    s = S.from_json({"name": "a", "values": [1.5], "counts": [1, 2]})
+    assert isinstance(s.values, numpy.ndarray)
+    assert isinstance(s.counts, numpy.ndarray)
+    assert s.name == "a"
+    assert s.json() == {"name": "a", "values": [1.5], "counts": [1, 2]}
+    assert s.json(canonical=True) == {"counts": [1, 2], "name": "a", "values": [1.5]}
+    assert S.from_bytes(s.to_bytes()).counts.tolist() == [1, 2]
+
+    s = S.from_json({"name": "a", "values": [1], "counts": None})
+    assert s.counts is None
+    assert S("a", numpy.array([])).json() == {"name": "a"}
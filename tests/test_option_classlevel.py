@@ -40,3 +40,22 @@ def test_option_classlevel_name_converter():
     x = {"statusCode": 1, "simpleValue": "simple"}
     assert o.json() == x
     assert Obj2.from_json(x) == o
+
+
+@dataclass
+class Base(J):
+    a: Optional[int] = None
+    b: Optional[str] = field(default=None, metadata={"j": json_options(name="B")})
+
+
+@dataclass
+class Child(Base):
+    __default_json_options__ = json_options(omitempty=True)
+
+
+def test_option_classlevel_not_poisoned_by_parent():
+    # Converts the parent class at first, which shares the field objects.
+    assert Base().json() == {"a": None, "B": None}
+    assert Child().json() == {}
+    assert Child(b="b").json() == {"B": "b"}
+    assert Base().json() == {"a": None, "B": None}
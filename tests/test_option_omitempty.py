@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from datetime import datetime
+from enum import IntEnum
+from typing import List, Optional
 
 from dataclass_jsonable import J, json_options
 
@@ -44,3 +46,43 @@ def test_option_omitempty_decoding():
     x = {"data": 3, "name": None}
     b = Book.from_json(x)
     assert b == Book(name="", data=3)
+
+
+class Level(IntEnum):
+    ZERO = 0
+    ONE = 1
+
+
+@dataclass
+class Inner(J):
+    a: int = 0
+
+
+@dataclass
+class Sparse(J):
+    __default_json_options__ = json_options(omitempty=True)
+
+    n: Optional[int] = None
+    s: str = ""
+    at: Optional[datetime] = None
+    inner: Optional[Inner] = None
+    level: Level = Level.ZERO
+    items: List[int] = field(default_factory=list)
+
+
+def test_option_omitempty_specialized():
+    assert Sparse().json() == {}
+    assert Sparse(n=0, s="", level=Level.ZERO).json() == {}
+    o = Sparse(
+        n=1,
+        s="s",
+        at=datetime.fromtimestamp(1),
+        inner=Inner(),
+        level=Level.ONE,
+        items=[0],
+    )
+    x = {"n": 1, "s": "s", "at": 1, "inner": {"a": 0}, "level": 1, "items": [0]}
+    assert o.json() == x
+    assert Sparse.from_json(x) == o
+    # Empty values from the dictionary are omitted as well.
+    assert Sparse.from_json({"inner": {}, "items": []}) == Sparse()
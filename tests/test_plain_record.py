@@ -0,0 +1,148 @@
+import sys
+from collections import namedtuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, ClassVar, Dict, List, NamedTuple, Optional
+
+from dataclass_jsonable import J, json_options, zero
+
+
+@dataclass
+class Address:
+    city: str
+    zip_code: Optional[str] = field(
+        default=None, metadata={"j": json_options(name="zip", omitempty=True)}
+    )
+    kind: ClassVar[str] = "address"
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    children: List["Node"] = field(default_factory=list)
+
+
+class Point(NamedTuple):
+    x: int
+    y: int = 0
+
+
+Pair = namedtuple("Pair", ["a", "b"])
+
+
+@dataclass
+class User(J):
+    name: str
+    address: Address
+    addresses: Dict[str, Address] = field(default_factory=dict)
+    tree: Optional[Node] = None
+    point: Point = Point(0)
+    pair: Optional[Pair] = None
+    extra: Any = None
+
+
+def test_plain_dataclass():
+    o = User("a", Address("x", "100"), {"h": Address("y")})
+    d = o.json()
+    assert d["address"] == {"city": "x", "zip": "100"}
+    assert d["addresses"] == {"h": {"city": "y"}}
+    assert User.from_json(d) == o
+
+
+def test_plain_recursive_dataclass():
+    tree = Node("r", [Node("a"), Node("b", [Node("c")])])
+    o = User("a", Address("x"), tree=tree)
+    d = o.json()
+    assert d["tree"]["children"][1] == {
+        "name": "b",
+        "children": [{"name": "c", "children": []}],
+    }
+    assert User.from_json(d).tree == tree
+
+
+def test_named_tuple():
+    o = User("a", Address("x"), point=Point(1, 2), pair=Pair(3, [4]))
+    d = o.json()
+    assert d["point"] == {"x": 1, "y": 2}
+    assert d["pair"] == {"a": 3, "b": [4]}
+    o2 = User.from_json(d)
+    assert o2 == o
+    assert type(o2.point) is Point
+    assert User.from_json({"name": "a", "address": {"city": "x"}, "point": {"x": 5}})
+
+
+def test_plain_record_any():
+    o = User("a", Address("x"), extra=Address("y", "1"))
+    assert o.json()["extra"] == {"city": "y", "zip": "1"}
+
+
+if sys.version_info.minor >= 8:
+    # TypedDict is available since Python 3.8.
+    from typing import TypedDict
+
+    class Money(TypedDict):
+        amount: str
+        currency: str
+
+    class Meta(TypedDict, total=False):
+        created_at: datetime
+        note: str
+
+    @dataclass
+    class Order(J):
+        money: Money
+        meta: Optional[Meta] = None
+
+    def test_typed_dict():
+        o = Order({"amount": "1.5", "currency": "USD"})
+        assert o.json() == {"money": {"amount": "1.5", "currency": "USD"}, "meta": None}
+        assert Order.from_json(o.json()) == o
+
+        o = Order(o.money, meta={"created_at": datetime.fromtimestamp(1)})
+        d = o.json()
+        assert d["meta"] == {"created_at": 1}
+        assert Order.from_json(d) == o
+
+    def test_typed_dict_zero():
+        assert zero(Money) == {"amount": "", "currency": ""}
+        assert zero(Meta) == {}
+
+
+@dataclass
+class Counter:
+    name: str
+    count: int = field(init=False, default=0)
+    tags: List[str] = field(init=False, default_factory=list)
+
+
+@dataclass
+class Stats(J):
+    counter: Counter
+    point: Point = Point(0)
+    pair: Optional[Pair] = None
+
+
+def test_plain_dataclass_init_false():
+    c = Counter("a")
+    c.count = 3
+    d = Stats(c).json()
+    assert d["counter"] == {"name": "a", "count": 3, "tags": []}
+    # Fields with init=False are not decoded.
+    assert Stats.from_json(d).counter == Counter("a")
+
+
+def test_plain_record_zero():
+    @dataclass
+    class S(J):
+        __default_factory__ = zero
+
+        counter: Counter
+        point: Point
+        pair: Pair
+        address: Address
+
+    o = S.from_json({})
+    assert o.counter == Counter("")
+    assert o.point == Point(0, 0) and type(o.point) is Point
+    assert o.pair == Pair(None, None)
+    assert o.address == Address("")
@@ -0,0 +1,69 @@
+from dataclasses import MISSING, dataclass, field
+from typing import List, Optional
+
+import pytest
+
+from dataclass_jsonable import J, json_options, zero
+
+
+@dataclass
+class Tag(J):
+    name: str
+
+
+@dataclass
+class Item(J):
+    id: int
+    status: str = field(metadata={"j": json_options(name="Status")})
+    tags: List[Tag] = field(default_factory=list)
+    note: Optional[str] = None
+
+
+def test_projection_from_json():
+    d = {"id": 1, "Status": "ok", "tags": [{"name": "a"}], "note": "x"}
+    o = Item.from_json(d, fields={"id", "note"})
+    assert o.id == 1
+    assert o.note == "x"
+    assert o.status is MISSING
+    assert o.tags == []
+
+
+def test_projection_json():
+    o = Item(1, "ok", [Tag("a")], "x")
+    assert o.json(fields=["id", "status"]) == {"id": 1, "Status": "ok"}
+    assert o.json() == {"id": 1, "Status": "ok", "tags": [{"name": "a"}], "note": "x"}
+
+
+def test_projection_cached():
+    p = Item.projection("id", "status")
+    assert Item.projection("status", "id") is p
+    d = {"id": 1, "Status": "ok", "tags": [{"name": "a"}]}
+    o = p.from_json(d)
+    assert o == Item(1, "ok")
+    assert p.json(o) == {"id": 1, "Status": "ok"}
+
+
+def test_projection_unknown_field():
+    with pytest.raises(ValueError):
+        Item.projection("id", "price")
+
+
+@dataclass
+class ItemWithZero(J):
+    __default_factory__ = zero
+
+    id: int
+    status: str
+
+
+def test_projection_default_factory():
+    assert ItemWithZero.from_json({"id": 1}, fields={"id"}) == ItemWithZero(1, "")
+
+
+def test_projection_missing_not_encoded():
+    d = {"id": 1, "Status": "ok", "tags": [{"name": "a"}]}
+    o = Item.from_json(d, fields={"id"})
+    assert o.json() == {"id": 1, "tags": [], "note": None}
+    assert o.json(memo=True) == o.json()
+    assert o.json(canonical=True) == {"id": 1, "note": None, "tags": []}
+    assert o.json_into({"Status": "x"}) == o.json()
@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pytest
+
+import dataclass_jsonable
+from dataclass_jsonable import J, dump_schema_cache, json_options, load_schema_cache
+
+
+@dataclass
+class Item(J):
+    name: "str"
+    price: "int" = field(default=0, metadata={"j": json_options(omitempty=True)})
+
+
+@dataclass
+class Cart(J):
+    items: "List[Item]"
+    tags: "Dict[str, str]" = field(default_factory=dict)
+    note: "Optional[str]" = field(default=None, metadata={"j": json_options(name="N")})
+
+
+@dataclass
+class VipCart(Cart):
+    level: "int" = 1
+
+
+@dataclass
+class Lambda(J):
+    x: int = field(default=0, metadata={"j": json_options(encoder=lambda x: x)})
+
+
+def _reset(*classes):
+    for cls in classes:
+        for attr in (
+            "__dataclass_jsonable_plan__",
+            "__dataclass_jsonable_options__",
+            "__dataclass_jsonable_hints__",
+        ):
+            if attr in cls.__dict__:
+                delattr(cls, attr)
+
+
+@pytest.fixture
+def classes():
+    classes = (Item, Cart, VipCart)
+    _reset(*classes)
+    yield classes
+    _reset(*classes)
+
+
+def test_schema_cache(tmp_path, monkeypatch, classes):
+    path = str(tmp_path / "schema.cache")
+    assert dump_schema_cache(path, classes) == 3
+    _reset(*classes)
+
+    assert load_schema_cache(path) == 3
+
+    def fail(*args, **kwds):
+        raise AssertionError("type hints should not be evaluated")
+
+    monkeypatch.setattr(dataclass_jsonable, "get_type_hints", fail)
+
+    cart = VipCart([Item("a", 1), Item("b")], {"k": "v"}, "hi", 2)
+    d = {
+        "items": [{"name": "a", "price": 1}, {"name": "b"}],
+        "tags": {"k": "v"},
+        "N": "hi",
+        "level": 2,
+    }
+    assert cart.json() == d
+    assert VipCart.from_json(d) == cart
+    assert Cart.from_json({"items": []}) == Cart([])
+
+
+def test_schema_cache_unpicklable(tmp_path):
+    path = str(tmp_path / "schema.cache")
+    _reset(Lambda)
+    assert dump_schema_cache(path, [Item, Lambda]) == 1
+
+
+def test_schema_cache_fingerprint_mismatch(tmp_path, monkeypatch, classes):
+    path = str(tmp_path / "schema.cache")
+    dump_schema_cache(path, classes)
+    _reset(*classes)
+
+    monkeypatch.setattr(
+        Item, "__default_json_options__", json_options(omitempty=True), raising=False
+    )
+    assert load_schema_cache(path) == 2
+    assert "__dataclass_jsonable_hints__" not in Item.__dict__
+    assert Item("a").json() == {"name": "a"}
+
+
+def test_schema_cache_missing_file(tmp_path):
+    assert load_schema_cache(str(tmp_path / "missing")) == 0
+
+
+def test_schema_cache_corrupt_file(tmp_path, classes):
+    path = tmp_path / "schema.cache"
+    dump_schema_cache(str(path), classes)
+    _reset(*classes)
+    data = path.read_bytes()
+
+    for corrupt in (data[: len(data) // 2], b"", b"I1\n.", b"garbage"):
+        path.write_bytes(corrupt)
+        assert load_schema_cache(str(path)) == 0
+    assert Item("a", 1).json() == {"name": "a", "price": 1}
@@ -0,0 +1,67 @@
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import FrozenSet, Optional, Set
+
+from dataclass_jsonable import J, json_options
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass
+class Obj(J):
+    a: Set[str]
+    b: FrozenSet[int] = frozenset()
+    c: Set[Color] = field(default_factory=set)
+    d: Optional[FrozenSet[float]] = None
+    e: set = field(default_factory=set)
+
+
+def test_set():
+    o = Obj({"x", "y"}, frozenset({1, 2}), {Color.RED}, frozenset({1.5}), {1, "z"})
+    d = o.json()
+    assert sorted(d["a"]) == ["x", "y"]
+    assert sorted(d["b"]) == [1, 2]
+    assert d["c"] == ["red"]
+    assert d["d"] == [1.5]
+    assert sorted(d["e"], key=str) == [1, "z"]
+    json.dumps(d)
+
+    o2 = Obj.from_json(d)
+    assert o2 == o
+    assert type(o2.b) is frozenset
+    assert type(o2.d) is frozenset
+
+
+def test_set_decode_float():
+    o = Obj.from_json({"a": [], "d": [1, 2]})
+    assert o.d == frozenset({1.0, 2.0})
+    assert all(type(e) is float for e in o.d)
+
+
+def test_set_convert_elements():
+    o = Obj({"x"}, frozenset({1}), d=frozenset({1, 2}))
+    d = o.json()
+    assert sorted(d["d"]) == [1.0, 2.0]
+    assert all(type(e) is float for e in d["d"])
+    # Elements are decoded one by one, like List[E].
+    o = Obj.from_json({"a": [1], "b": ["2"], "c": ["red"]})
+    assert o.a == {"1"} and o.b == frozenset({2}) and o.c == {Color.RED}
+
+
+@dataclass
+class Sorted(J):
+    __default_json_options__ = json_options(sort_set=True)
+
+    a: Set[str]
+    b: Optional[FrozenSet[Color]] = None
+    c: list = field(default_factory=list)
+
+
+def test_set_sorted():
+    o = Sorted({"b", "c", "a"}, frozenset({Color.RED, Color.BLUE}), [3, 1])
+    assert o.json() == {"a": ["a", "b", "c"], "b": ["blue", "red"], "c": [3, 1]}
+    assert Sorted({"x"}).json()["b"] is None
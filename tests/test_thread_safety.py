@@ -0,0 +1,51 @@
+import threading
+from dataclasses import dataclass, field, make_dataclass
+from typing import List, Optional
+
+from dataclass_jsonable import J, json_options
+
+
+@dataclass
+class Item(J):
+    n: int
+    tags: List[str] = field(default_factory=list)
+
+
+def test_concurrent_first_use():
+    for _ in range(20):
+        # A fresh class each round, so all threads race on its first use.
+        Order = make_dataclass(
+            "Order",
+            [
+                ("id", int),
+                ("items", List[Item], field(default_factory=list)),
+                (
+                    "note",
+                    Optional[str],
+                    field(default=None, metadata={"j": json_options(omitempty=True)}),
+                ),
+            ],
+            bases=(J,),
+        )
+        d = {"id": 1, "items": [{"n": 1, "tags": ["a"]}]}
+        expected = Order(id=1, items=[Item(1, ["a"])])
+
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def work():
+            barrier.wait()
+            try:
+                for _ in range(50):
+                    o = Order.from_json(d)
+                    assert o == expected
+                    assert o.json() == d
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
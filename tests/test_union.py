@@ -0,0 +1,157 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Union
+
+import pytest
+
+from dataclass_jsonable import J
+
+
+@dataclass
+class Click(J):
+    __json_tag__ = "click"
+
+    x: int
+    y: int
+
+
+@dataclass
+class Scroll(J):
+    __json_tag__ = "scroll"
+
+    delta: int
+
+
+@dataclass
+class KeyPress(J):
+    __json_tag__ = "key"
+
+    key: str
+    at: Optional[datetime] = None
+
+
+@dataclass
+class Session(J):
+    events: List[Union[Click, Scroll, KeyPress]] = field(default_factory=list)
+    last: Optional[Union[Click, Scroll]] = None
+
+
+def test_union_tagged():
+    o = Session(
+        events=[Click(1, 2), Scroll(3), KeyPress("a", datetime.fromtimestamp(1))],
+        last=Scroll(4),
+    )
+    x = {
+        "events": [
+            {"type": "click", "x": 1, "y": 2},
+            {"type": "scroll", "delta": 3},
+            {"type": "key", "key": "a", "at": 1},
+        ],
+        "last": {"type": "scroll", "delta": 4},
+    }
+    assert o.json() == x
+    # The tag comes first.
+    assert list(o.json()["last"]) == ["type", "delta"]
+    assert Session.from_json(x) == o
+    assert Session.from_json({"last": None}) == Session()
+
+
+def test_union_tagged_unknown_tag():
+    with pytest.raises(ValueError):
+        Session.from_json({"events": [{"type": "drag"}]})
+
+
+@dataclass
+class Sub(Click):
+    pass
+
+
+def test_union_tagged_subclass():
+    assert Session([Sub(1, 2)]).json() == {
+        "events": [{"type": "click", "x": 1, "y": 2}],
+        "last": None,
+    }
+
+
+@dataclass
+class Drag(J):
+    __json_tag_key__ = "kind"
+    __json_tag__ = "drag"
+
+    distance: int
+
+
+@dataclass
+class Touch(J):
+    __json_tag__ = "touch"
+
+    type: str
+
+
+def test_union_tagged_key_conflict():
+    @dataclass
+    class Ev(J):
+        e: Union[Click, Touch]
+
+    with pytest.raises(ValueError, match="conflicts with tag key 'type'"):
+        Ev(Touch("tap")).json()
+    with pytest.raises(ValueError, match="conflicts with tag key 'type'"):
+        Ev.from_json({"e": {"type": "touch"}})
+
+
+def test_union_tagged_invalid():
+    @dataclass
+    class A(J):
+        a: Union[Click, Drag]
+
+    @dataclass
+    class B(J):
+        b: Union[Click, Sub]
+
+    @dataclass
+    class C(J):
+        c: Union[Click, int]
+
+    with pytest.raises(NotImplementedError):
+        A(Click(1, 2)).json()
+    with pytest.raises(ValueError):
+        B.from_json({"b": {"type": "click", "x": 1, "y": 2}})
+    with pytest.raises(NotImplementedError):
+        C(1).json()
+
+
+@dataclass
+class Point(J):
+    x: int
+    y: int
+
+
+@dataclass
+class Circle(J):
+    r: int
+
+
+@dataclass
+class Shapes(J):
+    items: List[Union[Point, Circle, int, str]]
+    value: Union[str, float, None] = None
+
+
+def test_union_untagged():
+    o = Shapes([Point(1, 2), Circle(3), 4, "5", Circle(6), Point(7, 8)], 1.5)
+    x = {
+        "items": [{"x": 1, "y": 2}, {"r": 3}, 4, "5", {"r": 6}, {"x": 7, "y": 8}],
+        "value": 1.5,
+    }
+    assert o.json() == x
+    assert Shapes.from_json(x) == o
+    assert Shapes.from_json({"items": [], "value": "a"}) == Shapes([], "a")
+    assert Shapes.from_json({"items": [], "value": 1}) == Shapes([], 1.0)
+    assert Shapes.from_json({"items": []}) == Shapes([])
+
+
+def test_union_untagged_fail():
+    with pytest.raises(ValueError):
+        Shapes.from_json({"items": [1.5]})
+    with pytest.raises(TypeError):
+        Shapes([1.5]).json()  # type: ignore